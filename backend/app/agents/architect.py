@@ -374,16 +374,17 @@ class ArchitectAgent(BaseAgent):
             move_dist = (obj_to_move.bounding_box.width + other_obj.bounding_box.width) / 2 + self.min_spacing
             
             # Move away from the other object
-            obj_to_move.position.x += (dx / dist) * move_dist
-            obj_to_move.position.y += (dy / dist) * move_dist
+            new_x = obj_to_move.position.x + (dx / dist) * move_dist
+            new_y = obj_to_move.position.y + (dy / dist) * move_dist
             
             # Keep within room bounds
-            obj_to_move.position.x = max(self.room_bounds["x"][0] + obj_to_move.bounding_box.width/2,
-                                         min(self.room_bounds["x"][1] - obj_to_move.bounding_box.width/2,
-                                             obj_to_move.position.x))
-            obj_to_move.position.y = max(self.room_bounds["y"][0] + obj_to_move.bounding_box.depth/2,
-                                         min(self.room_bounds["y"][1] - obj_to_move.bounding_box.depth/2,
-                                             obj_to_move.position.y))
+            new_x = max(self.room_bounds["x"][0] + obj_to_move.bounding_box.width/2,
+                        min(self.room_bounds["x"][1] - obj_to_move.bounding_box.width/2,
+                            new_x))
+            new_y = max(self.room_bounds["y"][0] + obj_to_move.bounding_box.depth/2,
+                        min(self.room_bounds["y"][1] - obj_to_move.bounding_box.depth/2,
+                            new_y))
+            obj_to_move.position = obj_to_move.position._replace(x=new_x, y=new_y)
             
             moved_ids.add(id2)
             self.log_action(f"Resolved clipping for {obj_to_move.name}", {
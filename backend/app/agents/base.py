@@ -46,6 +46,8 @@ class BaseAgent(ABC):
             MessagesPlaceholder(variable_name="messages"),
             ("human", "{input}")
         ])
+        # Built once rather than on every call
+        self.chain = self.prompt | self.llm
         
         logger.info(f"Initialized {self.name} agent with model {self.model_name}")
     
@@ -84,8 +86,7 @@ class BaseAgent(ABC):
             messages.append(HumanMessage(content=f"Context: {context}"))
         
         try:
-            chain = self.prompt | self.llm
-            response = await chain.ainvoke(
+            response = await self.chain.ainvoke(
                 {
                     "messages": messages,
                     "input": input_text
@@ -118,14 +119,14 @@ class BaseAgent(ABC):
             f"User Request: {state.get('user_prompt', 'No prompt provided')[:500]}"
         ]
         
-        if state.get('master_plan'):
-            plan = state['master_plan']
+        plan = state.get('master_plan')
+        if plan:
             # Only include key plan info, not the entire object
             context_parts.append(f"Mood: {plan.interpreted_mood}")
             context_parts.append(f"Required Objects: {', '.join(plan.required_objects[:10])}")
         
-        if state.get('scene_objects'):
-            objects = state['scene_objects']
+        objects = state.get('scene_objects')
+        if objects:
             context_parts.append(f"Scene Objects: {len(objects)} total")
             # Only list first few objects to avoid token overflow
             for obj in objects[:max_objects]:
@@ -136,8 +137,8 @@ class BaseAgent(ABC):
         if state.get('lighting_setup'):
             context_parts.append(f"Lighting: Configured")
         
-        if state.get('validation_issues'):
-            issues = state['validation_issues']
+        issues = state.get('validation_issues')
+        if issues:
             context_parts.append(f"Validation Issues: {len(issues)} issues found")
         
         return "\n".join(context_parts)
@@ -68,9 +68,8 @@ class OrchestratorAgent(BaseAgent):
         Process the user prompt and create a master plan.
         Uses vector memory to find similar past scenes for context.
         """
-        self.log_action("Starting decomposition", {"prompt": state.get("user_prompt", "")[:100]})
-        
         user_prompt = state.get("user_prompt", "")
+        self.log_action("Starting decomposition", {"prompt": user_prompt[:100]})
         
         if not user_prompt:
             return {
@@ -2,14 +2,16 @@
 from typing import Optional, Dict, Any, List
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from pydantic import BaseModel, Field
+import asyncio
 import uuid
 import logging
 import time
 
-from ..workflow import run_workflow
+from ..workflow import run_workflow, get_graph_cache
 from ..models.messages import SceneRequest, SceneResponse
 from ..models.state import WorkflowStatus
 from ..memory.scene_memory import get_scene_memory
+from ..tasks import scene_data_from_result, submit_workflow_job, get_workflow_job
 from ..evaluation import (
     create_evaluation_dataset,
     run_scene_evaluation,
@@ -113,16 +115,27 @@ async def create_scene(request: CreateSceneRequest) -> SceneResponse:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/scene/create-async", response_model=JobStatus)
+@router.post("/scene/create-async", response_model=JobStatus, status_code=202)
 async def create_scene_async(
     request: CreateSceneRequest,
     background_tasks: BackgroundTasks
 ) -> JobStatus:
     """
     Create a scene asynchronously. Returns a job ID to poll for status.
+    
+    Jobs run on the Celery worker pool when configured, otherwise as
+    background tasks in this process.
     """
     job_id = str(uuid.uuid4())
     
+    # Submitting talks to the broker and result backend, so keep it off the loop
+    if await asyncio.to_thread(submit_workflow_job, job_id, request.prompt, request.max_iterations):
+        return JobStatus(
+            job_id=job_id,
+            status="pending",
+            progress="Job queued"
+        )
+    
     # Initialize job
     job_storage[job_id] = {
         "status": "pending",
@@ -149,11 +162,13 @@ async def create_scene_async(
 @router.get("/scene/status/{job_id}", response_model=JobStatus)
 async def get_job_status(job_id: str) -> JobStatus:
     """Get the status of an async scene creation job."""
-    if job_id not in job_storage:
+    job = job_storage.get(job_id)
+    if job is None:
+        # Reads the Celery result backend (network I/O)
+        job = await asyncio.to_thread(get_workflow_job, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = job_storage[job_id]
-    
     return JobStatus(
         job_id=job_id,
         status=job["status"],
@@ -302,7 +317,7 @@ async def get_scene_from_memory(scene_id: str):
     """Retrieve a specific scene from memory by ID."""
     try:
         memory = get_scene_memory()
-        scene = memory.get_scene_by_id(scene_id)
+        scene = memory.get_scene_by_id(scene_id, include_document=True)
         
         if not scene:
             raise HTTPException(status_code=404, detail="Scene not found in memory")
@@ -349,6 +364,15 @@ async def get_memory_stats() -> MemoryStatsResponse:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/memory/plan-cache")
+async def get_plan_cache_stats():
+    """Get hit/miss statistics of the semantic master plan cache."""
+    cache = get_graph_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "threshold": cache.threshold, **cache.get_stats()}
+
+
 @router.delete("/memory/clear")
 async def clear_memory():
     """
@@ -387,16 +411,7 @@ async def _run_workflow_background(
         )
         
         # Process result
-        scene_data = {
-            "objects": [
-                obj.model_dump() if hasattr(obj, 'model_dump') else obj
-                for obj in result.get("scene_objects", [])
-            ],
-            "lighting": result.get("lighting_setup").model_dump() if result.get("lighting_setup") else None,
-            "camera": result.get("camera_setup").model_dump() if result.get("camera_setup") else None,
-            "validation_passed": result.get("validation_passed"),
-            "final_report": result.get("final_report")
-        }
+        scene_data = scene_data_from_result(result)
         
         job_storage[job_id]["status"] = "completed"
         job_storage[job_id]["result"] = scene_data
@@ -1,6 +1,7 @@
 """Application configuration settings."""
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List
 
 
 class Settings(BaseSettings):
@@ -18,6 +19,12 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     debug: bool = True
+    # Uvicorn worker processes when not in debug/reload mode. Async job
+    # status is per process unless Celery is configured.
+    workers: int = 1
+    
+    # Comma-separated origins allowed to call the API from a browser
+    cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"
     
     # LLM Configuration
     default_model: str = "llama-3.3-70b-versatile"
@@ -29,9 +36,42 @@ class Settings(BaseSettings):
     langchain_project: str = "moo-director"
     langchain_endpoint: str = "https://api.smith.langchain.com"
     
+    # Scene Memory - directory with the int8 quantized ONNX embedding model
+    # (see app.memory.embeddings.export_quantized_model). Falls back to
+    # SentenceTransformer embeddings if the model is missing.
+    embedding_model_dir: str = "./models/all-MiniLM-L6-v2-int8"
+    # ChromaDB server (e.g. http://localhost:8000) shared by all processes.
+    # Needed with WORKERS > 1 or Celery: the embedded store under
+    # ./data/scene_memory doesn't show one process's new scenes to the
+    # searches of another. Empty uses the embedded store.
+    chroma_server_url: str = ""
+    # Store int8 copies of scene embeddings and rerank search candidates
+    # with them. Scenes stored while off sort after the reranked ones.
+    scene_memory_int8_rerank: bool = False
+    
+    # Workflow checkpoints - threads kept by the in-process checkpointer
+    checkpoint_max_threads: int = 1000
+    
+    # Async scene jobs - Celery broker (e.g. redis://localhost:6379/0) to run
+    # /scene/create-async jobs on a worker pool (requires celery). Empty runs
+    # them in the API process. The result backend defaults to the broker.
+    celery_broker_url: str = ""
+    celery_result_backend: str = ""
+    
+    # Semantic cache of the Orchestrator's master plan - prompts whose
+    # embeddings are at least graph_cache_threshold similar reuse the plan.
+    # Off by default: close prompts ("white bed" / "black bed") can match.
+    graph_cache_enabled: bool = False
+    graph_cache_threshold: float = 0.95
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+    
+    @property
+    def cors_origin_list(self) -> List[str]:
+        """Allowed CORS origins as a list."""
+        return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
 
 @lru_cache()
@@ -5,11 +5,74 @@ These evaluators can be used with LangSmith's evaluation framework
 to assess various aspects of generated 3D scenes.
 """
 from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
+from functools import cached_property
 import re
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Words ignored when extracting key terms from a prompt
+COMMON_PROMPT_WORDS = frozenset({
+    "create", "make", "with", "and", "the", "that", "this", "from",
+    "have", "will", "should", "could", "would", "into", "about",
+    "scene", "room", "space"
+})
+
+# Candidate key terms: words longer than 3 chars
+_KEY_TERM_PATTERN = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+
+@dataclass
+class SceneFeatures:
+    """
+    Derived features of a scene output, shared between evaluators.
+    
+    Each feature is computed lazily on first access and cached, so running
+    several evaluators over the same output walks the output only once.
+    """
+    output: Dict[str, Any]
+    
+    @cached_property
+    def scene_objects(self) -> List[Any]:
+        return _get_scene_objects(self.output)
+    
+    @cached_property
+    def object_count(self) -> int:
+        return len(self.scene_objects)
+    
+    @cached_property
+    def output_text(self) -> str:
+        """Lowercased searchable text of the output."""
+        return _extract_text_from_output(self.output, lower=True)
+    
+    @cached_property
+    def validation_passed(self) -> bool:
+        validation_passed = self.output.get("validation_passed", False)
+        
+        # Also check validation_report for API response format
+        if not validation_passed:
+            validation_report = self.output.get("validation_report", {})
+            validation_passed = validation_report.get("passed", False)
+        return validation_passed
+    
+    @cached_property
+    def validation_issues(self) -> List[Any]:
+        return self.output.get("validation_issues", [])
+    
+    @cached_property
+    def issues_by_severity(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for issue in self.validation_issues:
+            severity = _get_issue_severity(issue)
+            counts[severity] = counts.get(severity, 0) + 1
+        return counts
+
+
+def _extract_features(output: Dict[str, Any]) -> SceneFeatures:
+    """Wrap a scene output so derived features are computed once."""
+    return SceneFeatures(output)
+
 
 def scene_completeness_evaluator(
     run_output: Dict[str, Any],
@@ -28,22 +91,17 @@ def scene_completeness_evaluator(
     Returns:
         Dict with 'score' (0-1) and 'reasoning'
     """
+    return _scene_completeness_impl(_extract_features(run_output), example)
+
+
+def _scene_completeness_impl(
+    features: SceneFeatures,
+    example: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Score scene completeness from precomputed scene features."""
     try:
-        # Extract scene objects from output
-        scene_objects = run_output.get("scene_objects", [])
-        if not scene_objects:
-            scene_data = run_output.get("scene_data", {})
-            scene_objects = scene_data.get("objects", [])
-        
         # Extract object names
-        generated_names = set()
-        for obj in scene_objects:
-            if isinstance(obj, dict):
-                name = obj.get("name", "").lower()
-            else:
-                name = getattr(obj, "name", "").lower()
-            if name:
-                generated_names.add(name)
+        generated_names = {name for name in map(_name_of, features.scene_objects) if name}
         
         # Get expected objects from the example (if provided)
         expected_objects = example.get("expected_objects", [])
@@ -57,12 +115,14 @@ def scene_completeness_evaluator(
                 "reasoning": f"Generated {len(generated_names)} objects: {', '.join(generated_names) or 'none'}"
             }
         
-        # Calculate completeness score
-        expected_set = set(obj.lower() for obj in expected_objects)
-        found = generated_names.intersection(expected_set)
+        # Calculate completeness score. `&` probes from the smaller set, and
+        # missing is derived from the (small) found set rather than re-probing
+        # all generated names.
+        expected_set = {obj.lower() for obj in expected_objects}
+        found = expected_set & generated_names
         score = len(found) / len(expected_set) if expected_set else 1.0
         
-        missing = expected_set - generated_names
+        missing = expected_set - found if found else expected_set
         reasoning = f"Found {len(found)}/{len(expected_set)} expected objects."
         if missing:
             reasoning += f" Missing: {', '.join(missing)}"
@@ -99,21 +159,21 @@ def prompt_alignment_evaluator(
     Returns:
         Dict with 'score' (0-1) and 'reasoning'
     """
+    return _prompt_alignment_impl(_extract_features(run_output), example)
+
+
+def _prompt_alignment_impl(
+    features: SceneFeatures,
+    example: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Score prompt alignment from precomputed scene features."""
     try:
         # Get the original prompt
         prompt = example.get("inputs", {}).get("prompt", "")
         if not prompt:
             prompt = example.get("prompt", "")
         
-        # Extract key terms from prompt (nouns and adjectives)
-        # Simple approach: extract words longer than 3 chars, excluding common words
-        common_words = {
-            "create", "make", "with", "and", "the", "that", "this", "from",
-            "have", "will", "should", "could", "would", "into", "about",
-            "scene", "room", "space"
-        }
-        words = re.findall(r'\b[a-zA-Z]{4,}\b', prompt.lower())
-        key_terms = [w for w in words if w not in common_words]
+        key_terms = _extract_key_terms(prompt)
         
         if not key_terms:
             return {
@@ -123,7 +183,7 @@ def prompt_alignment_evaluator(
             }
         
         # Build a string representation of the output
-        output_text = _extract_text_from_output(run_output).lower()
+        output_text = features.output_text
         
         # Count how many key terms appear in the output
         found_terms = [term for term in key_terms if term in output_text]
@@ -160,26 +220,21 @@ def validation_pass_evaluator(
     Returns:
         Dict with 'score' (0 or 1) and 'reasoning'
     """
+    return _validation_pass_impl(_extract_features(run_output), example)
+
+
+def _validation_pass_impl(
+    features: SceneFeatures,
+    example: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Score validation pass from precomputed scene features."""
     try:
-        # Check validation passed flag
-        validation_passed = run_output.get("validation_passed", False)
-        
-        # Also check scene_data for API response format
-        if not validation_passed:
-            scene_data = run_output.get("scene_data", {})
-            validation_report = run_output.get("validation_report", {})
-            validation_passed = validation_report.get("passed", False)
+        validation_passed = features.validation_passed
         
         # Count validation issues
-        validation_issues = run_output.get("validation_issues", [])
-        error_count = sum(
-            1 for issue in validation_issues 
-            if _get_issue_severity(issue) == "error"
-        )
-        warning_count = sum(
-            1 for issue in validation_issues 
-            if _get_issue_severity(issue) == "warning"
-        )
+        validation_issues = features.validation_issues
+        error_count = features.issues_by_severity.get("error", 0)
+        warning_count = features.issues_by_severity.get("warning", 0)
         
         score = 1.0 if validation_passed else 0.0
         reasoning = f"Validation {'passed' if validation_passed else 'failed'}."
@@ -217,14 +272,16 @@ def object_count_evaluator(
     Returns:
         Dict with 'score' (0-1) and 'reasoning'
     """
+    return _object_count_impl(_extract_features(run_output), example)
+
+
+def _object_count_impl(
+    features: SceneFeatures,
+    example: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Score object count from precomputed scene features."""
     try:
-        # Extract scene objects
-        scene_objects = run_output.get("scene_objects", [])
-        if not scene_objects:
-            scene_data = run_output.get("scene_data", {})
-            scene_objects = scene_data.get("objects", [])
-        
-        object_count = len(scene_objects)
+        object_count = features.object_count
         
         # Get expected range from example (or use defaults)
         min_objects = example.get("min_objects", 1)
@@ -258,50 +315,84 @@ def object_count_evaluator(
         }
 
 
-def _extract_text_from_output(output: Dict[str, Any]) -> str:
-    """Extract searchable text from scene output."""
-    parts = []
+def _extract_text_from_output(output: Dict[str, Any], *, lower: bool = False) -> str:
+    """
+    Extract searchable text from scene output.
     
-    # Add object names and materials
-    scene_objects = output.get("scene_objects", [])
-    if not scene_objects:
-        scene_data = output.get("scene_data", {})
-        scene_objects = scene_data.get("objects", [])
+    Args:
+        output: The scene output
+        lower: Lowercase each part as it is collected, avoiding a second
+               full-size copy when the caller needs lowercase text
+    """
+    parts: List[str] = []
+    append = (lambda text: parts.append(text.lower())) if lower else parts.append
     
-    for obj in scene_objects:
+    # Add object names and materials
+    for obj in _get_scene_objects(output):
         if isinstance(obj, dict):
-            parts.append(obj.get("name", ""))
-            material = obj.get("material", {})
-            if isinstance(material, dict):
-                parts.append(material.get("name", ""))
+            name = obj.get("name")
+            material = obj.get("material")
+            material_name = material.get("name") if isinstance(material, dict) else None
         else:
-            parts.append(getattr(obj, "name", ""))
-            if hasattr(obj, "material") and obj.material:
-                parts.append(getattr(obj.material, "name", ""))
+            name = getattr(obj, "name", None)
+            material = getattr(obj, "material", None)
+            material_name = getattr(material, "name", None) if material else None
+        if name:
+            append(name)
+        if material_name:
+            append(material_name)
     
     # Add lighting info
-    lighting = output.get("lighting_setup", {})
-    if not lighting:
-        scene_data = output.get("scene_data", {})
-        lighting = scene_data.get("lighting", {})
-    
+    lighting = _get_lighting(output)
     if isinstance(lighting, dict):
-        parts.append(lighting.get("hdri_map", ""))
+        hdri_map = lighting.get("hdri_map")
+        if hdri_map:
+            append(hdri_map)
         for light in lighting.get("lights", []):
             if isinstance(light, dict):
-                parts.append(light.get("name", ""))
+                light_name = light.get("name")
+                if light_name:
+                    append(light_name)
     
     # Add master plan info if available
     master_plan = output.get("master_plan")
     if master_plan:
         if isinstance(master_plan, dict):
-            parts.append(master_plan.get("interpreted_mood", ""))
-            parts.extend(master_plan.get("required_objects", []))
+            mood = master_plan.get("interpreted_mood")
+            required_objects = master_plan.get("required_objects", [])
         else:
-            parts.append(getattr(master_plan, "interpreted_mood", ""))
-            parts.extend(getattr(master_plan, "required_objects", []))
+            mood = getattr(master_plan, "interpreted_mood", None)
+            required_objects = getattr(master_plan, "required_objects", [])
+        if mood:
+            append(mood)
+        for required_object in required_objects:
+            if required_object:
+                append(str(required_object))
     
-    return " ".join(str(p) for p in parts if p)
+    return " ".join(parts)
+
+
+def _extract_key_terms(prompt: str) -> List[str]:
+    """Extract key terms (nouns and adjectives) from a prompt, excluding common words."""
+    words = _KEY_TERM_PATTERN.findall(prompt.lower())
+    return [w for w in words if w not in COMMON_PROMPT_WORDS]
+
+
+def _get_scene_objects(output: Dict[str, Any]) -> List[Any]:
+    """Get scene objects from either the workflow state or API response format."""
+    return output.get("scene_objects") or output.get("scene_data", {}).get("objects", [])
+
+
+def _get_lighting(output: Dict[str, Any]) -> Any:
+    """Get the lighting setup from either the workflow state or API response format."""
+    return output.get("lighting_setup") or output.get("scene_data", {}).get("lighting", {})
+
+
+def _name_of(obj) -> str:
+    """Extract the lowercased name from a scene object (dict or model)."""
+    if isinstance(obj, dict):
+        return (obj.get("name") or "").lower()
+    return (getattr(obj, "name", None) or "").lower()
 
 
 def _get_issue_severity(issue) -> str:
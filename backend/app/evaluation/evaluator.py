@@ -7,7 +7,15 @@ and retrieve evaluation results using LangSmith.
 from typing import Dict, Any, List, Optional, Callable
 import logging
 import asyncio
-from datetime import datetime
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from statistics import fmean
+from types import MappingProxyType
 
 from langsmith import Client
 from langsmith.evaluation import evaluate
@@ -19,12 +27,20 @@ from .custom_evaluators import (
     prompt_alignment_evaluator,
     validation_pass_evaluator,
     object_count_evaluator,
+    _extract_features,
+    _scene_completeness_impl,
+    _prompt_alignment_impl,
+    _validation_pass_impl,
+    _object_count_impl,
 )
 
 logger = logging.getLogger(__name__)
 
+# Number of result rows between checkpoint saves in run_scene_evaluation
+CHECKPOINT_INTERVAL = 10
+
 # Default evaluation examples for 3D scene generation
-DEFAULT_EVALUATION_EXAMPLES = [
+_RAW_EVALUATION_EXAMPLES = [
     {
         "inputs": {"prompt": "Create a cozy bedroom with a white bed, wooden desk, and warm morning light"},
         "expected_objects": ["bed", "desk"],
@@ -57,11 +73,27 @@ DEFAULT_EVALUATION_EXAMPLES = [
     },
 ]
 
+# Immutable view of the default examples (nested inputs included), so callers
+# can't alter the module-level defaults. Object names are normalized here once.
+DEFAULT_EVALUATION_EXAMPLES = tuple(
+    MappingProxyType({
+        "inputs": MappingProxyType(dict(example["inputs"])),
+        "expected_objects": tuple(obj.lower() for obj in example["expected_objects"]),
+        "min_objects": example["min_objects"],
+        "max_objects": example["max_objects"],
+    })
+    for example in _RAW_EVALUATION_EXAMPLES
+)
+
 
+@lru_cache(maxsize=1)
 def _get_langsmith_client() -> Optional[Client]:
     """
     Get a LangSmith client if configured.
     
+    The client is cached so its HTTP connection pool is reused across calls.
+    Call ``_get_langsmith_client.cache_clear()`` after changing settings.
+    
     Returns:
         LangSmith Client or None if not configured.
     """
@@ -76,6 +108,124 @@ def _get_langsmith_client() -> Optional[Client]:
     )
 
 
+def _as_dict(obj: Any) -> Any:
+    """Convert a LangSmith result object to a dict, leaving other values as-is."""
+    to_dict = getattr(obj, "dict", None)
+    if callable(to_dict):
+        return to_dict()
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    return obj
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read a field from a LangSmith object or its dict form."""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _checkpoint_path(
+    checkpoint_dir: Optional[str],
+    experiment_prefix: str,
+    dataset_name: str,
+) -> str:
+    """Get the checkpoint file path for an experiment prefix and dataset."""
+    directory = checkpoint_dir or tempfile.gettempdir()
+    return os.path.join(directory, f"{experiment_prefix}_{dataset_name}.ckpt.json")
+
+
+def _example_key(inputs: Any) -> Optional[str]:
+    """
+    Get a stable key identifying a dataset example from its inputs.
+    
+    The target function only receives the example inputs, so resumed
+    examples are matched on their full (canonically serialized) inputs.
+    """
+    if not isinstance(inputs, dict):
+        return None
+    return json.dumps(inputs, sort_keys=True, default=str)
+
+
+def _result_row(result: Any) -> Optional[Dict[str, Any]]:
+    """
+    Flatten an evaluate() result row into input, output and scores.
+    
+    LangSmith rows hold the Run, the dataset Example and the evaluation
+    results ({"results": [...]}); the example's inputs are used as the input,
+    since the run's inputs wrap them in the target's argument names.
+    """
+    result = _as_dict(result)
+    if not isinstance(result, dict):
+        return None
+    
+    run = result.get("run")
+    example = result.get("example")
+    inputs = _field(example, "inputs") or result.get("input", result.get("inputs", {}))
+    outputs = _field(run, "outputs") or result.get("output", result.get("outputs", {}))
+    
+    eval_results = result.get("evaluation_results", result.get("feedback", []))
+    if isinstance(eval_results, dict):
+        eval_results = eval_results.get("results", [])
+    scores = {}
+    for eval_result in map(_as_dict, eval_results or ()):
+        if isinstance(eval_result, dict):
+            scores[eval_result.get("key", "unknown")] = eval_result.get("score", 0)
+    
+    example_id = _field(example, "id")
+    return {
+        "example_id": str(example_id) if example_id is not None else None,
+        "input": inputs,
+        "output": outputs,
+        "scores": scores,
+    }
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON fallback for Pydantic models and other non-serializable values."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def _load_checkpoint(path: str) -> Dict[str, Any]:
+    """
+    Load outputs of already-processed examples from a checkpoint file.
+    
+    Returns:
+        Dict mapping example key to its checkpoint row (input and output).
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable evaluation checkpoint {path}: {e}")
+        return {}
+    
+    completed = {}
+    for row in checkpoint.get("results", []):
+        key = _example_key(row.get("input"))
+        output = row.get("output") or {}
+        # Failed generations are retried rather than resumed
+        if key and not output.get("error"):
+            completed[key] = row
+    return completed
+
+
+def _save_checkpoint(path: str, rows: List[Dict[str, Any]]) -> None:
+    """Atomically write the processed example rows to a checkpoint file."""
+    try:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"results": rows}, f, default=_json_default)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to save evaluation checkpoint {path}: {e}")
+
+
 def create_evaluation_dataset(
     dataset_name: str = "3d-scene-prompts",
     description: str = "Evaluation dataset for 3D scene generation prompts",
@@ -114,10 +264,10 @@ def create_evaluation_dataset(
         examples = examples or DEFAULT_EVALUATION_EXAMPLES
         for example in examples:
             client.create_example(
-                inputs=example.get("inputs", {}),
-                outputs=example.get("outputs", {}),
+                inputs=dict(example.get("inputs", {})),
+                outputs=dict(example.get("outputs", {})),
                 metadata={
-                    "expected_objects": example.get("expected_objects", []),
+                    "expected_objects": list(example.get("expected_objects", [])),
                     "min_objects": example.get("min_objects", 1),
                     "max_objects": example.get("max_objects", 20),
                 },
@@ -159,6 +309,38 @@ def list_datasets() -> List[Dict[str, Any]]:
         return []
 
 
+# Persistent event loop used to run async generation from LangSmith's worker threads
+_bg_loop: Optional[asyncio.AbstractEventLoop] = None
+_bg_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get (or start) the background event loop used by evaluation targets.
+    
+    Reusing a single loop avoids creating and tearing down a new event loop
+    for every dataset example.
+    
+    Returns:
+        A running event loop owned by a daemon thread.
+    """
+    global _bg_loop
+    
+    if _bg_loop is None:
+        with _bg_loop_lock:
+            if _bg_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="evaluation-loop",
+                    daemon=True,
+                ).start()
+                atexit.register(loop.call_soon_threadsafe, loop.stop)
+                _bg_loop = loop
+    
+    return _bg_loop
+
+
 async def _run_scene_generation(inputs: Dict[str, Any]) -> Dict[str, Any]:
     """
     Run scene generation for evaluation.
@@ -190,6 +372,8 @@ def run_scene_evaluation(
     experiment_prefix: str = "moo-director-eval",
     evaluators: Optional[List[Callable]] = None,
     max_concurrency: int = 2,
+    max_results: int = 1000,
+    checkpoint_dir: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     Run evaluation on a dataset.
@@ -199,6 +383,13 @@ def run_scene_evaluation(
         experiment_prefix: Prefix for the experiment name
         evaluators: List of evaluator functions. If None, uses default evaluators.
         max_concurrency: Maximum number of concurrent evaluations
+        max_results: Maximum number of result rows kept in the returned summary
+                     (LangSmith's ExperimentResults keeps all rows regardless).
+                     Remaining rows are still consumed so every example runs.
+        checkpoint_dir: Directory for progress checkpoints (defaults to the
+                        system temp directory). An interrupted run with the same
+                        prefix and dataset resumes without regenerating scenes
+                        for examples that were already processed.
         
     Returns:
         Evaluation results summary or None if failed.
@@ -224,16 +415,29 @@ def run_scene_evaluation(
             logger.error(f"Dataset '{dataset_name}' not found. Create it first using /evaluation/datasets/create")
             return None
         
-        # Create experiment name with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Create experiment name with (UTC) timestamp
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
         experiment_name = f"{experiment_prefix}_{timestamp}"
         
         logger.info(f"Starting evaluation: {experiment_name} on dataset: {dataset_name}")
         
+        # Resume from a previous interrupted run if a checkpoint exists
+        checkpoint_path = _checkpoint_path(checkpoint_dir, experiment_prefix, dataset_name)
+        completed = _load_checkpoint(checkpoint_path)
+        if completed:
+            logger.info(f"Resuming evaluation with {len(completed)} examples from {checkpoint_path}")
+        
         # Define the target function that wraps our async workflow
         def target_func(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            key = _example_key(inputs)
+            if key in completed:
+                return completed[key]["output"]
+            
             try:
-                return asyncio.run(_run_scene_generation(inputs))
+                future = asyncio.run_coroutine_threadsafe(
+                    _run_scene_generation(inputs), _get_background_loop()
+                )
+                return future.result()
             except Exception as e:
                 logger.error(f"Target function failed: {e}")
                 return {"error": str(e)}
@@ -245,6 +449,9 @@ def run_scene_evaluation(
             evaluators=evaluators,
             experiment_prefix=experiment_name,
             max_concurrency=max_concurrency,
+            client=client,
+            # Yield rows as examples finish instead of after the whole run
+            blocking=False,
         )
         
         # Summarize results - handle both generator and list cases
@@ -255,42 +462,45 @@ def run_scene_evaluation(
             "results": [],
         }
         
-        # Process results - results might be a generator or ExperimentResults object
+        # Process results - results might be a generator or ExperimentResults object.
+        # Rows are summarized as they arrive; ExperimentResults still keeps its
+        # own copy of every row, so max_results bounds only the summary.
+        # Every processed row is checkpointed (not just the summarized ones),
+        # on top of the resumed ones, so a resumed run can skip all of them.
+        checkpoint_rows = dict(completed)
+        processed = 0
+        finished = False
         try:
-            # Try to iterate over results
-            result_list = list(results) if hasattr(results, '__iter__') else []
-            for result in result_list:
-                # Handle different result formats
-                if hasattr(result, 'dict'):
-                    result = result.dict()
-                elif hasattr(result, '__dict__'):
-                    result = vars(result)
+            for result in results:
+                row = _result_row(result)
+                if row is None:
+                    continue
                 
-                if isinstance(result, dict):
-                    result_dict = {
-                        "input": result.get("input", result.get("inputs", {})),
-                        "output": result.get("output", result.get("outputs", {})),
-                        "scores": {},
+                key = _example_key(row["input"])
+                if key:
+                    checkpoint_rows[key] = {
+                        "example_id": row["example_id"],
+                        "input": row["input"],
+                        "output": row["output"],
                     }
-                    
-                    # Extract evaluation scores
-                    eval_results = result.get("evaluation_results", result.get("feedback", []))
-                    if eval_results:
-                        for eval_result in eval_results:
-                            if hasattr(eval_result, 'dict'):
-                                eval_result = eval_result.dict()
-                            elif hasattr(eval_result, '__dict__'):
-                                eval_result = vars(eval_result)
-                            
-                            if isinstance(eval_result, dict):
-                                key = eval_result.get("key", "unknown")
-                                score = eval_result.get("score", 0)
-                                result_dict["scores"][key] = score
-                    
-                    summary["results"].append(result_dict)
+                processed += 1
+                if processed % CHECKPOINT_INTERVAL == 0:
+                    _save_checkpoint(checkpoint_path, list(checkpoint_rows.values()))
+                
+                if len(summary["results"]) < max_results:
+                    summary["results"].append(row)
+            finished = True
         except Exception as iter_error:
             logger.warning(f"Could not iterate results: {iter_error}")
             # Still return summary with experiment name so user can check dashboard
+        finally:
+            if finished:
+                # Run finished - the checkpoint is no longer needed
+                if os.path.exists(checkpoint_path):
+                    os.remove(checkpoint_path)
+            else:
+                # Keep the checkpoint (including resumed rows) so the run can be resumed
+                _save_checkpoint(checkpoint_path, list(checkpoint_rows.values()))
         
         logger.info(f"Evaluation completed: {experiment_name}")
         return summary
@@ -364,15 +574,20 @@ async def quick_evaluate_prompt(prompt: str) -> Dict[str, Any]:
         "max_objects": 20,
     }
     
-    # Run evaluators
+    # Extract shared scene features once, then run the evaluators concurrently
+    features = _extract_features(result)
+    evaluators = [
+        _scene_completeness_impl,
+        _prompt_alignment_impl,
+        _validation_pass_impl,
+        _object_count_impl,
+    ]
+    eval_results = await asyncio.gather(
+        *(asyncio.to_thread(evaluator, features, example) for evaluator in evaluators)
+    )
+    
     evaluations = {}
-    for evaluator in [
-        scene_completeness_evaluator,
-        prompt_alignment_evaluator,
-        validation_pass_evaluator,
-        object_count_evaluator,
-    ]:
-        eval_result = evaluator(result, example)
+    for eval_result in eval_results:
         evaluations[eval_result["key"]] = {
             "score": eval_result["score"],
             "reasoning": eval_result["reasoning"],
@@ -382,5 +597,5 @@ async def quick_evaluate_prompt(prompt: str) -> Dict[str, Any]:
         "prompt": prompt,
         "result": result,
         "evaluations": evaluations,
-        "overall_score": sum(e["score"] for e in evaluations.values()) / len(evaluations),
+        "overall_score": fmean(e["score"] for e in evaluations.values()),
     }
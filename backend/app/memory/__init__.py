@@ -1,4 +1,4 @@
 # Memory module for vector-based scene retrieval
-from .scene_memory import SceneMemory, SceneRecord
+from .scene_memory import SceneMemory, SceneRecord, SceneMeta
 
-__all__ = ["SceneMemory", "SceneRecord"]
+__all__ = ["SceneMemory", "SceneRecord", "SceneMeta"]
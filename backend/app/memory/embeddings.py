@@ -0,0 +1,242 @@
+"""
+Embedding functions for scene memory.
+
+Provides an int8 dynamically-quantized MiniLM embedding function running on
+ONNX Runtime, which is considerably faster on CPU than the FP32 PyTorch
+SentenceTransformer model it replaces.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import base64
+import hashlib
+import logging
+import os
+import threading
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+# Optional dependencies for the quantized ONNX backend
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# File name produced by optimum's ORTQuantizer
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+# Fast tokenizer file written by save_pretrained
+TOKENIZER_FILE = "tokenizer.json"
+
+# Scale for int8 scalar quantization of L2-normalized embeddings ([-1, 1] -> [-127, 127])
+INT8_SCALE = 127.0
+
+
+@lru_cache(maxsize=None)
+def _shared_tokenizer(model_dir: str, max_length: int) -> "Tokenizer":
+    """
+    Load the Rust tokenizer for a model directory once per process.
+    
+    A single instance is thread-safe and encode_batch parallelizes across
+    texts internally, so every embedding function shares it.
+    """
+    tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+    tokenizer.enable_truncation(max_length=max_length)
+    pad_id = tokenizer.token_to_id("[PAD]")
+    # Pad to the longest text in each batch rather than max_length
+    tokenizer.enable_padding(pad_id=pad_id or 0, pad_token="[PAD]")
+    return tokenizer
+
+
+class QuantizedONNXEmbeddingFunction(EmbeddingFunction):
+    """
+    ChromaDB embedding function backed by a quantized ONNX MiniLM model.
+    
+    Produces mean-pooled, L2-normalized sentence embeddings matching
+    SentenceTransformer's all-MiniLM-L6-v2 output.
+    """
+    
+    def __init__(self, model_dir: str, max_length: int = 256):
+        """
+        Load the quantized model and tokenizer.
+        
+        Args:
+            model_dir: Directory containing the quantized ONNX model and tokenizer files
+            max_length: Maximum number of tokens per text
+        """
+        self.max_length = max_length
+        self.tokenizer = _shared_tokenizer(model_dir, max_length)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, QUANTIZED_MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        encodings = self.tokenizer.encode_batch(list(input))
+        encoded = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        }
+        feeds = {name: encoded[name] for name in self.input_names if name in encoded}
+        token_embeddings = self.session.run(None, feeds)[0]
+        
+        # Mean pooling over non-padding tokens, then L2 normalization
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return (pooled / norms).tolist()
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    LRU cache in front of another embedding function.
+    
+    The workflow stores and searches the same prompts repeatedly during
+    revision loops; cached texts skip the model forward pass entirely.
+    Texts are keyed on their normalized (stripped, lowercased) form, which
+    is safe because MiniLM's tokenizer is uncased.
+    """
+    
+    def __init__(self, embedding_function: EmbeddingFunction, maxsize: int = 1024):
+        self.embedding_function = embedding_function
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.strip().lower().encode("utf-8"), digest_size=16).digest()
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [self._key(text) for text in input]
+        embeddings: List[Optional[List[float]]] = []
+        misses: Dict[bytes, List[int]] = {}
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                else:
+                    misses.setdefault(key, []).append(i)
+                embeddings.append(cached)
+        
+        if misses:
+            # Embed all distinct misses in a single batch
+            miss_keys = list(misses)
+            computed = self.embedding_function([input[misses[key][0]] for key in miss_keys])
+            
+            with self._lock:
+                for key, embedding in zip(miss_keys, computed):
+                    embedding = list(embedding)
+                    for i in misses[key]:
+                        embeddings[i] = embedding
+                    self._cache[key] = embedding
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        
+        return embeddings
+    
+    def cache_clear(self) -> None:
+        """Drop all cached embeddings."""
+        with self._lock:
+            self._cache.clear()
+
+
+def quantize_int8(embedding: Sequence[float]) -> np.ndarray:
+    """Scalar-quantize an L2-normalized embedding to int8."""
+    scaled = np.rint(np.asarray(embedding, dtype=np.float32) * INT8_SCALE)
+    return np.clip(scaled, -127, 127).astype(np.int8)
+
+
+def encode_int8(embedding: Sequence[float]) -> str:
+    """Quantize an embedding to int8 and encode it as a compact metadata string."""
+    return base64.b64encode(quantize_int8(embedding).tobytes()).decode("ascii")
+
+
+def decode_int8(encoded: str) -> np.ndarray:
+    """Decode an int8 embedding produced by encode_int8."""
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.int8)
+
+
+def int8_scores(query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    Dot-product similarity between an int8 query and a matrix of int8 candidates.
+    
+    Accumulates in int32 to avoid int8 overflow.
+    """
+    return np.einsum("ij,j->i", candidates.astype(np.int32), query.astype(np.int32))
+
+
+def load_quantized_embedding_function(
+    model_dir: Optional[str],
+) -> Optional[QuantizedONNXEmbeddingFunction]:
+    """
+    Load the quantized ONNX embedding function if it is available.
+    
+    Args:
+        model_dir: Directory containing the exported quantized model
+        
+    Returns:
+        The embedding function, or None if the dependencies or model artifact are missing
+    """
+    if not ONNX_AVAILABLE or not model_dir:
+        return None
+    
+    if not all(
+        os.path.exists(os.path.join(model_dir, name))
+        for name in (QUANTIZED_MODEL_FILE, TOKENIZER_FILE)
+    ):
+        logger.info(f"No quantized embedding model found in {model_dir}")
+        return None
+    
+    try:
+        return QuantizedONNXEmbeddingFunction(model_dir)
+    except Exception as e:
+        logger.warning(f"Could not load quantized embedding model: {e}")
+        return None
+
+
+def export_quantized_model(
+    output_dir: str,
+    model_name: str = f"sentence-transformers/{EMBEDDING_MODEL_NAME}",
+) -> str:
+    """
+    Export and dynamically quantize the embedding model to int8 ONNX.
+    
+    Requires the `optimum[onnxruntime]` package. Run once, offline:
+    
+        python -c "from app.memory.embeddings import export_quantized_model; export_quantized_model('./models/all-MiniLM-L6-v2-int8')"
+    
+    Args:
+        output_dir: Directory to write the quantized model and tokenizer to
+        model_name: Hugging Face model to export
+        
+    Returns:
+        The output directory
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    
+    logger.info(f"Exported quantized embedding model to {output_dir}")
+    return output_dir
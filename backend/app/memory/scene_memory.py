@@ -2,12 +2,23 @@
 Vector Memory for Scene Storage and Retrieval.
 Uses ChromaDB for semantic search over past scenes.
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Deque, Tuple
+from collections import deque
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-import json
+import asyncio
+import atexit
+import hashlib
+import heapq
 import logging
 import os
-from pydantic import BaseModel, Field
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+import orjson
+import numpy as np
+from pydantic import TypeAdapter
 
 # Disable ChromaDB telemetry via environment variable (before import)
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
@@ -24,22 +35,128 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     embedding_functions = None
 
+from ..config import get_settings
 from ..models.state import SceneObject, LightingSetup, CameraSetup, MasterPlan
+from .embeddings import (
+    EMBEDDING_MODEL_NAME,
+    CachedEmbeddingFunction,
+    decode_int8,
+    encode_int8,
+    int8_scores,
+    load_quantized_embedding_function,
+    quantize_int8,
+)
 
 logger = logging.getLogger(__name__)
 
+# Default number of scenes written to ChromaDB per add() call
+DEFAULT_BATCH_SIZE = 100
+MIN_BATCH_SIZE = 50
+MAX_BATCH_SIZE = 250
 
-class SceneRecord(BaseModel):
-    """A record of a completed scene stored in memory."""
+# How long (ms) the background writer waits for more scenes after the first,
+# so scenes completed by concurrent workflows share one embedding call
+DEFAULT_WRITE_FLUSH_MS = 50
+
+# Times the background writer tries a scene before dropping it
+WRITE_ATTEMPTS = 3
+
+# How long (s) count() trusts its cached value before re-reading it. Other
+# processes (Celery workers, extra uvicorn workers) write to the same
+# collection, so the count can't only track this process's writes.
+COUNT_REFRESH_SECONDS = 1.0
+
+# Number of most recent scene IDs tracked for get_recent_scenes
+RECENT_SCENES_CAPACITY = 100
+
+# Metadata rows read per page when rebuilding the recent-scenes buffer
+RECENT_SCAN_PAGE_SIZE = 500
+
+# Color temperature (Kelvin) thresholds for lighting mood classification
+WARM_TEMPERATURE_MAX = 4000
+COOL_TEMPERATURE_MIN = 5500
+
+# Candidates fetched from ChromaDB for int8 reranking
+RERANK_CANDIDATES = 50
+
+# Serializers are built once; dump_python then runs entirely in pydantic-core
+_OBJECTS_ADAPTER = TypeAdapter(List[SceneObject])
+_LIGHTING_ADAPTER = TypeAdapter(Optional[LightingSetup])
+_CAMERA_ADAPTER = TypeAdapter(Optional[CameraSetup])
+
+# Object IDs are random per run, so they are left out of the content hash
+_VOLATILE_OBJECT_FIELDS = {"__all__": {"id", "parent_id"}}
+
+
+# ChromaDB clients by persist directory (None for in-memory) or server URL.
+# Opening a client loads the persisted index, so SceneMemory instances share them.
+_clients: Dict[Optional[str], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(persist_directory: Optional[str]) -> Any:
+    """
+    Return the shared ChromaDB client for a persist directory, creating it once.
+    
+    When CHROMA_SERVER_URL is set, the ChromaDB server is used instead. An
+    embedded client only sees vectors added by its own process, so
+    deployments with several writers (uvicorn workers, Celery workers)
+    need the server for searches to find each other's scenes.
+    """
+    server_url = get_settings().chroma_server_url
+    key = server_url or persist_directory
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+        
+        # Initialize ChromaDB with telemetry disabled
+        settings = Settings(
+            anonymized_telemetry=False,
+            allow_reset=True
+        )
+        
+        if server_url:
+            url = urlparse(server_url)
+            client = chromadb.HttpClient(
+                host=url.hostname or "localhost",
+                port=str(url.port or 8000),
+                ssl=url.scheme == "https",
+                settings=settings
+            )
+            logger.info(f"Connected SceneMemory to ChromaDB server at {server_url}")
+        elif persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            client = chromadb.PersistentClient(
+                path=persist_directory,
+                settings=settings
+            )
+            logger.info(f"Initialized persistent SceneMemory at {persist_directory}")
+        else:
+            client = chromadb.Client(settings=settings)
+            logger.info("Initialized in-memory SceneMemory")
+        
+        _clients[key] = client
+        return client
+
+
+@dataclass(slots=True, kw_only=True)
+class SceneRecord:
+    """
+    A record of a completed scene stored in memory.
+    
+    A plain slotted dataclass: records are only built internally from
+    already-validated models, so Pydantic validation is unnecessary.
+    """
     id: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = field(default_factory=datetime.utcnow)
     
     # Original request
     user_prompt: str
     interpreted_mood: str = ""
     
     # Scene summary
-    object_names: List[str] = Field(default_factory=list)
+    object_names: List[str] = field(default_factory=list)
     object_count: int = 0
     
     # Lighting summary
@@ -58,18 +175,124 @@ class SceneRecord(BaseModel):
     # Full data (JSON serialized)
     full_scene_data: Optional[str] = None
     
+    # Hash of the prompt and scene content, used to skip duplicate writes
+    content_hash: str = ""
+    
     def to_search_text(self) -> str:
         """Convert to searchable text for embedding."""
-        parts = [
-            f"Scene: {self.user_prompt}",
-            f"Mood: {self.interpreted_mood}",
-            f"Objects: {', '.join(self.object_names)}",
-        ]
+        text = (
+            f"Scene: {self.user_prompt} | Mood: {self.interpreted_mood}"
+            f" | Objects: {', '.join(self.object_names)}"
+        )
         if self.lighting_mood:
-            parts.append(f"Lighting: {self.lighting_mood}")
+            text += f" | Lighting: {self.lighting_mood}"
         if self.focal_length:
-            parts.append(f"Camera: {self.focal_length}mm f/{self.aperture}")
-        return " | ".join(parts)
+            text += f" | Camera: {self.focal_length}mm f/{self.aperture}"
+        return text
+
+
+@dataclass(slots=True)
+class SceneMeta:
+    """
+    ChromaDB metadata stored for each scene.
+    
+    Field names match the stored metadata keys, so rows round-trip with
+    ``SceneMeta(**metadata)`` and ``to_metadata()``.
+    """
+    user_prompt: str = ""
+    interpreted_mood: str = ""
+    object_count: int = 0
+    object_names: str = "[]"  # JSON-encoded list
+    lighting_mood: str = ""
+    validation_passed: str = "False"
+    timestamp: str = ""
+    content_hash: str = ""
+    embedding_int8: str = ""  # base64 int8 codes, only with int8 reranking
+    
+    @classmethod
+    def from_record(cls, record: SceneRecord) -> "SceneMeta":
+        """Build the metadata stored for a record."""
+        return cls(
+            record.user_prompt,
+            record.interpreted_mood,
+            record.object_count,
+            orjson.dumps(record.object_names).decode(),
+            record.lighting_mood,
+            str(record.validation_passed),
+            record.timestamp.isoformat(),
+            record.content_hash
+        )
+    
+    @classmethod
+    def from_metadata(cls, metadata: Optional[Dict[str, Any]]) -> "SceneMeta":
+        """Unpack a metadata row returned by ChromaDB."""
+        if not metadata:
+            return cls()
+        try:
+            return cls(**metadata)
+        except TypeError:
+            # Rows written by another version may carry unknown keys
+            return cls(**{key: metadata[key] for key in _SCENE_META_FIELDS if key in metadata})
+    
+    def to_metadata(self, include_embedding: bool = True) -> Dict[str, Any]:
+        """Convert to a ChromaDB metadata dict (ChromaDB rejects empty values as None)."""
+        metadata = {
+            "user_prompt": self.user_prompt,
+            "interpreted_mood": self.interpreted_mood,
+            "object_count": self.object_count,
+            "object_names": self.object_names,
+            "lighting_mood": self.lighting_mood,
+            "validation_passed": self.validation_passed,
+            "timestamp": self.timestamp
+        }
+        if self.content_hash:
+            metadata["content_hash"] = self.content_hash
+        if include_embedding and self.embedding_int8:
+            metadata["embedding_int8"] = self.embedding_int8
+        return metadata
+    
+    @property
+    def passed(self) -> bool:
+        return self.validation_passed == "True"
+
+
+_SCENE_META_FIELDS = tuple(f.name for f in fields(SceneMeta))
+
+
+def _content_hash(
+    user_prompt: str,
+    objects: List[SceneObject],
+    lighting: Optional[LightingSetup],
+    camera: Optional[CameraSetup]
+) -> str:
+    """Hash a scene's prompt and content, ignoring per-run object IDs."""
+    payload = orjson.dumps(
+        [
+            user_prompt,
+            _OBJECTS_ADAPTER.dump_python(objects, mode="json", exclude=_VOLATILE_OBJECT_FIELDS),
+            _LIGHTING_ADAPTER.dump_python(lighting, mode="json"),
+            _CAMERA_ADAPTER.dump_python(camera, mode="json")
+        ],
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _classify_color_temperature(temperature: float) -> str:
+    """Classify a color temperature as a warm, neutral, or cool mood."""
+    if temperature < WARM_TEMPERATURE_MAX:
+        return "warm"
+    if temperature > COOL_TEMPERATURE_MIN:
+        return "cool"
+    return "neutral"
+
+
+def _light_arrays(lighting: LightingSetup) -> Tuple[np.ndarray, np.ndarray]:
+    """Color temperatures and intensities of all lights as contiguous arrays."""
+    count = len(lighting.lights)
+    temperatures = np.fromiter((light.color_temperature for light in lighting.lights), dtype=np.int32, count=count)
+    intensities = np.fromiter((light.intensity for light in lighting.lights), dtype=np.float32, count=count)
+    return temperatures, intensities
 
 
 class SceneMemory:
@@ -81,7 +304,11 @@ class SceneMemory:
     def __init__(
         self,
         persist_directory: Optional[str] = None,
-        collection_name: str = "scene_memory"
+        collection_name: str = "scene_memory",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        int8_rerank: bool = False,
+        background_writes: bool = True,
+        write_flush_ms: int = DEFAULT_WRITE_FLUSH_MS
     ):
         """
         Initialize the scene memory.
@@ -89,34 +316,61 @@ class SceneMemory:
         Args:
             persist_directory: Directory to persist the vector DB (None for in-memory)
             collection_name: Name of the ChromaDB collection
+            batch_size: Number of scenes written per ChromaDB add() call
+                        when bulk storing (clamped to 50-250)
+            int8_rerank: Store int8-quantized embeddings alongside each scene and
+                         rerank search candidates with them (requires an
+                         embedding function)
+            background_writes: Write scenes from store_scene on a background
+                               thread so callers don't wait for embedding
+            write_flush_ms: Time the background writer waits for more scenes
+                            to batch with the first queued one
         """
         self.collection_name = collection_name
+        self.batch_size = max(MIN_BATCH_SIZE, min(batch_size, MAX_BATCH_SIZE))
+        
+        # Pending writes, flushed to ChromaDB in a single add() call
+        self._pending_ids: List[str] = []
+        self._pending_documents: List[str] = []
+        self._pending_metadatas: List[Dict[str, Any]] = []
+        self._write_lock = threading.RLock()
+        
+        # Scenes queued by store_scene for the background writer, and those
+        # not yet written (for read-after-write consistency in get_scene_by_id)
+        self._write_queue: "queue.Queue[SceneRecord]" = queue.Queue()
+        self._unwritten: Dict[str, SceneRecord] = {}
+        self._write_attempts: Dict[str, int] = {}
+        self.dropped_writes = 0
+        self.background_writes = background_writes
+        self.write_flush_seconds = max(0, write_flush_ms) / 1000
+        
+        # Most recent scene IDs, newest last. ChromaDB can't sort by timestamp,
+        # so this avoids scanning the whole collection on every request.
+        self._recent_ids: Deque[str] = deque(maxlen=RECENT_SCENES_CAPACITY)
+        # Collection size the buffer accounts for; a larger count means other
+        # processes stored scenes the buffer hasn't seen
+        self._recent_synced_count = 0
+        
         self.embedding_function = None
+        self.embedding_model = EMBEDDING_MODEL_NAME
         self.use_embeddings = False
         
-        # Initialize ChromaDB with telemetry disabled
-        settings = Settings(
-            anonymized_telemetry=False,
-            allow_reset=True
-        )
-        
         if persist_directory:
             self.persist_directory = persist_directory
-            os.makedirs(persist_directory, exist_ok=True)
-            self.client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=settings
-            )
-            logger.info(f"Initialized persistent SceneMemory at {persist_directory}")
-        else:
-            self.client = chromadb.Client(settings=settings)
-            logger.info("Initialized in-memory SceneMemory")
+        self.client = _get_client(persist_directory)
         
-        # Try to use sentence-transformers for embeddings (optional)
-        if SENTENCE_TRANSFORMERS_AVAILABLE and embedding_functions:
+        # Prefer the int8 quantized ONNX model, then sentence-transformers (both optional)
+        self.embedding_function = load_quantized_embedding_function(
+            get_settings().embedding_model_dir
+        )
+        if self.embedding_function:
+            self.use_embeddings = True
+            self.embedding_model = f"{EMBEDDING_MODEL_NAME} (int8 ONNX)"
+            logger.info("Using quantized ONNX embeddings for semantic search")
+        elif SENTENCE_TRANSFORMERS_AVAILABLE and embedding_functions:
             try:
                 self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                    model_name="all-MiniLM-L6-v2"
+                    model_name=EMBEDDING_MODEL_NAME
                 )
                 self.use_embeddings = True
                 logger.info("Using SentenceTransformer embeddings for semantic search")
@@ -126,25 +380,38 @@ class SceneMemory:
         else:
             logger.info("SentenceTransformers not available, using default ChromaDB embeddings")
         
-        # Get or create collection
+        # Cache embeddings so repeated prompts skip the model forward pass
         if self.embedding_function:
-            self.collection = self.client.get_or_create_collection(
-                name=collection_name,
-                embedding_function=self.embedding_function,
-                metadata={"description": "Moo Director scene memory"}
-            )
-        else:
-            # Use default ChromaDB embeddings
-            self.collection = self.client.get_or_create_collection(
-                name=collection_name,
-                metadata={"description": "Moo Director scene memory"}
-            )
+            self.embedding_function = CachedEmbeddingFunction(self.embedding_function)
+        self.int8_rerank = int8_rerank and self.embedding_function is not None
+        
+        # Get or create collection (default ChromaDB embeddings if none set)
+        collection_kwargs: Dict[str, Any] = {
+            "name": collection_name,
+            "metadata": {"description": "Moo Director scene memory"}
+        }
+        if self.embedding_function:
+            collection_kwargs["embedding_function"] = self.embedding_function
+        self.collection = self.client.get_or_create_collection(**collection_kwargs)
+        
+        # ChromaDB's count() is a SQL COUNT(*); cache it for a short while
+        self._cached_count = 0
+        self._count_read_at = 0.0
+        self.refresh_count()
+        self._load_recent_ids()
         
-        logger.info(f"SceneMemory collection '{collection_name}' has {self.collection.count()} scenes")
+        if self.background_writes:
+            threading.Thread(
+                target=self._writer_loop,
+                name="scene-memory-writer",
+                daemon=True
+            ).start()
+        
+        logger.info(f"SceneMemory collection '{collection_name}' has {self._cached_count} scenes")
     
     def store_scene(
         self,
-        scene_id: str,
+        scene_id: Optional[str],
         user_prompt: str,
         master_plan: Optional[MasterPlan],
         scene_objects: List[SceneObject],
@@ -156,8 +423,14 @@ class SceneMemory:
         """
         Store a completed scene in memory.
         
+        With background writes enabled, the scene is queued and embedded on
+        the writer thread; this returns without waiting for ChromaDB. Scenes
+        stored without a scene_id whose prompt and content match an already
+        stored scene are skipped.
+        
         Args:
-            scene_id: Unique identifier for the scene
+            scene_id: Unique identifier for the scene (None to use the
+                      content hash, which makes repeated stores idempotent)
             user_prompt: Original user request
             master_plan: The orchestrator's master plan
             scene_objects: List of scene objects
@@ -169,9 +442,271 @@ class SceneMemory:
         Returns:
             The created SceneRecord
         """
-        # Create scene record
-        record = SceneRecord(
-            id=scene_id,
+        record = self._build_record(
+            scene_id=scene_id,
+            user_prompt=user_prompt,
+            master_plan=master_plan,
+            scene_objects=scene_objects,
+            lighting_setup=lighting_setup,
+            camera_setup=camera_setup,
+            validation_passed=validation_passed,
+            validation_score=validation_score
+        )
+        if self.background_writes:
+            self._unwritten[record.id] = record
+            self._write_queue.put(record)
+        else:
+            with self._write_lock:
+                self._enqueue(record)
+                self._write_pending()
+        
+        logger.info(f"Stored scene {record.id} in memory: '{user_prompt[:50]}...'")
+        return record
+    
+    async def store_scene_async(self, **kwargs: Any) -> SceneRecord:
+        """
+        Store a completed scene without blocking the event loop.
+        
+        Args:
+            **kwargs: The same keyword arguments as store_scene
+            
+        Returns:
+            The created SceneRecord
+        """
+        return await asyncio.to_thread(self.store_scene, **kwargs)
+    
+    def store_scene_batch(self, scenes: List[Dict[str, Any]]) -> List[SceneRecord]:
+        """
+        Store many completed scenes, writing them to ChromaDB in batches.
+        
+        Each batch is embedded and committed with a single add() call, which
+        is much faster than storing scenes one at a time.
+        
+        Args:
+            scenes: List of dicts with the same keyword arguments as store_scene
+            
+        Returns:
+            The created SceneRecords
+        """
+        records = []
+        with self._write_lock:
+            for scene in scenes:
+                record = self._build_record(**scene)
+                records.append(record)
+                if self._enqueue(record) >= self.batch_size:
+                    self._write_pending()
+            self._write_pending()
+        
+        logger.info(f"Stored {len(records)} scenes in memory")
+        return records
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued scenes have been written to ChromaDB.
+        
+        Call on shutdown so background writes are not lost.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            
+        Returns:
+            True if all scenes were written, False on timeout
+        """
+        write_queue = self._write_queue
+        with write_queue.all_tasks_done:
+            drained = write_queue.all_tasks_done.wait_for(
+                lambda: not write_queue.unfinished_tasks, timeout
+            )
+        
+        with self._write_lock:
+            self._write_pending()
+        return drained
+    
+    def _writer_loop(self) -> None:
+        """Background thread: drain queued scenes and write them in batches."""
+        while True:
+            records = [self._write_queue.get()]
+            deadline = time.monotonic() + self.write_flush_seconds
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self._write_queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            try:
+                with self._write_lock:
+                    for record in records:
+                        self._enqueue(record)
+                    self._write_pending()
+                failed = []
+            except Exception as e:
+                logger.error(f"Failed to write {len(records)} scenes to memory: {e}")
+                failed = records
+            
+            # Requeue failed scenes (before marking these done, so flush()
+            # keeps waiting) until they run out of attempts
+            for record in failed:
+                attempts = self._write_attempts.get(record.id, 0) + 1
+                if attempts < WRITE_ATTEMPTS:
+                    self._write_attempts[record.id] = attempts
+                    self._write_queue.put(record)
+                else:
+                    self._write_attempts.pop(record.id, None)
+                    self._unwritten.pop(record.id, None)
+                    self.dropped_writes += 1
+                    logger.error(f"Dropped scene {record.id} after {attempts} failed writes")
+            
+            requeued = {record.id for record in failed} & self._write_attempts.keys()
+            for record in records:
+                if record.id not in requeued:
+                    self._write_attempts.pop(record.id, None)
+                    self._unwritten.pop(record.id, None)
+                self._write_queue.task_done()
+    
+    def _write_pending(self) -> int:
+        """
+        Write all pending scenes to ChromaDB in a single add() call.
+        
+        Returns:
+            Number of scenes written
+        """
+        if not self._pending_ids:
+            return 0
+        
+        ids = self._pending_ids
+        documents = self._pending_documents
+        metadatas = self._pending_metadatas
+        self._pending_ids = []
+        self._pending_documents = []
+        self._pending_metadatas = []
+        
+        keep = self._new_content_indices(ids, metadatas)
+        keep = [keep[i] for i in self._new_id_indices([ids[i] for i in keep])]
+        if len(keep) < len(ids):
+            logger.info(f"Skipping {len(ids) - len(keep)} scenes already in memory")
+            if not keep:
+                return 0
+            ids = [ids[i] for i in keep]
+            documents = [documents[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+        
+        # Embed the whole batch in one call and hand the vectors to add(),
+        # rather than embedding per scene (int8) and again inside add()
+        embeddings = None
+        if self.embedding_function is not None:
+            embeddings = self.embedding_function(documents)
+            if self.int8_rerank:
+                for metadata, embedding in zip(metadatas, embeddings):
+                    metadata["embedding_int8"] = encode_int8(embedding)
+        
+        self.collection.add(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=embeddings
+        )
+        self._cached_count += len(ids)
+        self._recent_synced_count += len(ids)
+        self._recent_ids.extend(ids)
+        return len(ids)
+    
+    def _new_content_indices(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> List[int]:
+        """
+        Find pending rows whose content is not stored yet.
+        
+        Only rows whose ID was derived from their content (stored without a
+        scene_id) are deduplicated; rows with a caller-supplied ID are always
+        written so they can be looked up by that ID. Uses one metadata lookup
+        for the whole batch and also drops repeats within the batch.
+        
+        Returns:
+            Indices of the rows to write
+        """
+        hashes = [
+            metadata.get("content_hash", "") if scene_id == metadata.get("content_hash") else ""
+            for scene_id, metadata in zip(ids, metadatas)
+        ]
+        lookup = list({h for h in hashes if h})
+        seen = set()
+        if lookup:
+            existing = self.collection.get(
+                where={"content_hash": {"$in": lookup}},
+                include=["metadatas"]
+            )
+            seen = {metadata["content_hash"] for metadata in existing["metadatas"] or []}
+        
+        keep = []
+        for i, content_hash in enumerate(hashes):
+            if content_hash and content_hash in seen:
+                continue
+            if content_hash:
+                seen.add(content_hash)
+            keep.append(i)
+        return keep
+    
+    def _new_id_indices(self, ids: List[str]) -> List[int]:
+        """
+        Find pending rows whose ID is not stored yet.
+        
+        ChromaDB's add() ignores existing IDs and rejects repeats within a
+        call, so both are dropped here to keep the cached count exact.
+        
+        Returns:
+            Indices of the rows to write
+        """
+        if not ids:
+            return []
+        seen = set(self.collection.get(ids=list(set(ids)), include=[])["ids"])
+        keep = []
+        for i, scene_id in enumerate(ids):
+            if scene_id in seen:
+                continue
+            seen.add(scene_id)
+            keep.append(i)
+        return keep
+    
+    def count(self) -> int:
+        """
+        Number of scenes in the collection.
+        
+        Writes by this instance are counted immediately; the value is
+        re-read from ChromaDB at most every COUNT_REFRESH_SECONDS to pick up
+        scenes written by other processes.
+        """
+        if time.monotonic() - self._count_read_at >= COUNT_REFRESH_SECONDS:
+            return self.refresh_count()
+        return self._cached_count
+    
+    def refresh_count(self) -> int:
+        """
+        Re-read the scene count from ChromaDB.
+        
+        Returns:
+            The current scene count
+        """
+        with self._write_lock:
+            self._cached_count = self.collection.count()
+            self._count_read_at = time.monotonic()
+        return self._cached_count
+    
+    def _build_record(
+        self,
+        scene_id: Optional[str],
+        user_prompt: str,
+        master_plan: Optional[MasterPlan],
+        scene_objects: List[SceneObject],
+        lighting_setup: Optional[LightingSetup],
+        camera_setup: Optional[CameraSetup],
+        validation_passed: bool,
+        validation_score: Optional[int] = None
+    ) -> SceneRecord:
+        """Create a SceneRecord summarizing a completed scene."""
+        # Only content-derived IDs are deduplicated, so skip hashing otherwise
+        content_hash = ""
+        if scene_id is None:
+            content_hash = _content_hash(user_prompt, scene_objects, lighting_setup, camera_setup)
+        return SceneRecord(
+            id=scene_id or content_hash,
             user_prompt=user_prompt,
             interpreted_mood=master_plan.interpreted_mood if master_plan else "",
             object_names=[obj.name for obj in scene_objects],
@@ -185,29 +720,21 @@ class SceneMemory:
             validation_score=validation_score,
             full_scene_data=self._serialize_scene_data(
                 scene_objects, lighting_setup, camera_setup
-            )
-        )
-        
-        # Create searchable text
-        search_text = record.to_search_text()
-        
-        # Store in ChromaDB
-        self.collection.add(
-            ids=[scene_id],
-            documents=[search_text],
-            metadatas=[{
-                "user_prompt": user_prompt,
-                "interpreted_mood": record.interpreted_mood,
-                "object_count": record.object_count,
-                "object_names": json.dumps(record.object_names),
-                "lighting_mood": record.lighting_mood,
-                "validation_passed": str(validation_passed),
-                "timestamp": record.timestamp.isoformat()
-            }]
+            ),
+            content_hash=content_hash
         )
+    
+    def _enqueue(self, record: SceneRecord) -> int:
+        """
+        Add a record to the pending write batch.
         
-        logger.info(f"Stored scene {scene_id} in memory: '{user_prompt[:50]}...'")
-        return record
+        Returns:
+            Number of pending records
+        """
+        self._pending_ids.append(record.id)
+        self._pending_documents.append(record.to_search_text())
+        self._pending_metadatas.append(SceneMeta.from_record(record).to_metadata())
+        return len(self._pending_ids)
     
     def search_similar_scenes(
         self,
@@ -226,65 +753,155 @@ class SceneMemory:
         Returns:
             List of similar scenes with metadata
         """
-        if self.collection.count() == 0:
+        similar_scenes = self.search_similar_scenes_batch([query], n_results, min_score)[0]
+        logger.info(f"Found {len(similar_scenes)} similar scenes for query: '{query[:50]}...'")
+        return similar_scenes
+    
+    def search_similar_scenes_batch(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        min_score: float = 0.0
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for scenes similar to several queries at once.
+        
+        All queries are embedded in one forward pass and answered by a
+        single ChromaDB query.
+        
+        Args:
+            queries: Search queries (natural language)
+            n_results: Maximum number of results per query
+            min_score: Minimum similarity score (0-1)
+            
+        Returns:
+            One list of similar scenes per query, in query order
+        """
+        if not queries:
             return []
         
+        # Over-fetch candidates when reranking with int8 embeddings
+        n_candidates = max(n_results, RERANK_CANDIDATES) if self.int8_rerank else n_results
+        
+        # Cap at the collection size (ChromaDB warns otherwise). Another
+        # process may have written since the count was read, so an empty
+        # count still queries rather than returning no results.
+        count = self.count()
+        
         # Query ChromaDB
         results = self.collection.query(
-            query_texts=[query],
-            n_results=min(n_results, self.collection.count()),
-            include=["documents", "metadatas", "distances"]
+            query_texts=list(queries),
+            n_results=min(n_candidates, count) if count else n_candidates,
+            include=["metadatas", "distances"]
         )
         
-        similar_scenes = []
+        all_ids = results["ids"] or []
+        all_metadatas = results["metadatas"]
+        all_distances = results["distances"]
+        int8_rerank = self.int8_rerank
+        from_metadata = SceneMeta.from_metadata
+        batch_results = []
         
-        if results and results["ids"] and results["ids"][0]:
-            for i, scene_id in enumerate(results["ids"][0]):
-                # ChromaDB returns L2 distance, convert to similarity score
-                distance = results["distances"][0][i] if results["distances"] else 0
-                similarity = 1 / (1 + distance)  # Convert distance to similarity
+        for q, query in enumerate(queries):
+            similar_scenes = []
+            ids = all_ids[q] if q < len(all_ids) else []
+            
+            if ids:
+                metadatas = all_metadatas[q] if all_metadatas else [None] * len(ids)
+                
+                # ChromaDB returns L2 distance, convert to similarity scores
+                if all_distances:
+                    similarities = 1.0 / (1.0 + np.asarray(all_distances[q], dtype=np.float64))
+                else:
+                    similarities = np.ones(len(ids))
+                passing = similarities >= min_score
                 
-                if similarity >= min_score:
-                    metadata = results["metadatas"][0][i] if results["metadatas"] else {}
-                    
-                    similar_scenes.append({
-                        "id": scene_id,
-                        "similarity": round(similarity, 3),
-                        "user_prompt": metadata.get("user_prompt", ""),
-                        "interpreted_mood": metadata.get("interpreted_mood", ""),
-                        "object_count": metadata.get("object_count", 0),
-                        "object_names": json.loads(metadata.get("object_names", "[]")),
-                        "lighting_mood": metadata.get("lighting_mood", ""),
-                        "validation_passed": metadata.get("validation_passed") == "True",
-                        "timestamp": metadata.get("timestamp", "")
+                if int8_rerank:
+                    metas = [from_metadata(metadata) for metadata in metadatas]
+                    order = [i for i in self._rerank_int8(query, metas)[:n_results] if passing[i]]
+                else:
+                    order = np.flatnonzero(passing).tolist()
+                    metas = {i: from_metadata(metadatas[i]) for i in order}
+                
+                append = similar_scenes.append
+                for i in order:
+                    meta = metas[i]
+                    append({
+                        "id": ids[i],
+                        # Python's round, not np.round: they differ on values
+                        # just around a halfway point (np.round scales by 10**3)
+                        "similarity": round(float(similarities[i]), 3),
+                        "user_prompt": meta.user_prompt,
+                        "interpreted_mood": meta.interpreted_mood,
+                        "object_count": meta.object_count,
+                        "object_names": orjson.loads(meta.object_names),
+                        "lighting_mood": meta.lighting_mood,
+                        "validation_passed": meta.passed,
+                        "timestamp": meta.timestamp
                     })
+            
+            batch_results.append(similar_scenes)
         
-        logger.info(f"Found {len(similar_scenes)} similar scenes for query: '{query[:50]}...'")
-        return similar_scenes
+        return batch_results
     
-    def get_scene_by_id(self, scene_id: str) -> Optional[Dict[str, Any]]:
+    def _rerank_int8(self, query: str, metas: List[SceneMeta]) -> List[int]:
+        """
+        Order search candidates by int8 dot-product similarity to the query.
+        
+        Candidates stored without int8 embeddings keep their ChromaDB order
+        after the reranked ones.
+        
+        Returns:
+            Candidate indices, best match first
+        """
+        query_codes = quantize_int8(self.embedding_function([query])[0])
+        
+        indexed = [i for i, meta in enumerate(metas) if meta.embedding_int8]
+        if not indexed:
+            return list(range(len(metas)))
+        
+        codes = np.stack([decode_int8(metas[i].embedding_int8) for i in indexed])
+        scores = int8_scores(query_codes, codes)
+        reranked = [indexed[j] for j in np.argsort(-scores, kind="stable")]
+        
+        indexed_set = set(indexed)
+        return reranked + [i for i in range(len(metas)) if i not in indexed_set]
+    
+    def get_scene_by_id(
+        self,
+        scene_id: str,
+        include_document: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Retrieve a specific scene by ID.
         
         Args:
             scene_id: The scene ID
+            include_document: Also return the embedded search text
             
         Returns:
             Scene data or None if not found
         """
+        # Scenes still queued for the background writer
+        record = self._unwritten.get(scene_id)
+        if record is not None:
+            scene = {"id": scene_id, **SceneMeta.from_record(record).to_metadata()}
+            if include_document:
+                scene["document"] = record.to_search_text()
+            return scene
+        
         try:
             result = self.collection.get(
                 ids=[scene_id],
-                include=["documents", "metadatas"]
+                include=["documents", "metadatas"] if include_document else ["metadatas"]
             )
             
             if result and result["ids"]:
-                metadata = result["metadatas"][0] if result["metadatas"] else {}
-                return {
-                    "id": scene_id,
-                    "document": result["documents"][0] if result["documents"] else "",
-                    **metadata
-                }
+                meta = SceneMeta.from_metadata(result["metadatas"][0] if result["metadatas"] else None)
+                scene = {"id": scene_id, **meta.to_metadata(include_embedding=False)}
+                if include_document:
+                    scene["document"] = result["documents"][0] if result["documents"] else ""
+                return scene
         except Exception as e:
             logger.error(f"Error retrieving scene {scene_id}: {e}")
         
@@ -295,35 +912,47 @@ class SceneMemory:
         Get the most recent scenes.
         
         Args:
-            limit: Maximum number of scenes to return
+            limit: Maximum number of scenes to return (at most RECENT_SCENES_CAPACITY)
             
         Returns:
             List of recent scenes
         """
-        # ChromaDB doesn't have built-in sorting, so we get all and sort
         try:
-            result = self.collection.get(
-                include=["metadatas"],
-                limit=min(limit * 2, self.collection.count())  # Get extra to ensure enough
-            )
+            # Only the buffered scenes are served; a larger limit would
+            # otherwise trigger a collection scan on every call
+            limit = min(limit, RECENT_SCENES_CAPACITY)
             
+            # Reload the buffer if other processes changed the collection, or
+            # if deletions left it short of scenes that exist
+            count = self.count()
+            if count != self._recent_synced_count or (
+                len(self._recent_ids) < limit and count > len(self._recent_ids)
+            ):
+                self._load_recent_ids()
+            
+            recent_ids = list(reversed(self._recent_ids))[:limit]
+            if not recent_ids:
+                return []
+            
+            result = self.collection.get(ids=recent_ids, include=["metadatas"])
             if not result or not result["ids"]:
                 return []
             
+            metadata_by_id = dict(zip(result["ids"], result["metadatas"] or []))
+            
             scenes = []
-            for i, scene_id in enumerate(result["ids"]):
-                metadata = result["metadatas"][i] if result["metadatas"] else {}
+            for scene_id in recent_ids:
+                if scene_id not in metadata_by_id:
+                    continue
+                meta = SceneMeta.from_metadata(metadata_by_id[scene_id])
                 scenes.append({
                     "id": scene_id,
-                    "user_prompt": metadata.get("user_prompt", ""),
-                    "interpreted_mood": metadata.get("interpreted_mood", ""),
-                    "object_count": metadata.get("object_count", 0),
-                    "timestamp": metadata.get("timestamp", "")
+                    "user_prompt": meta.user_prompt,
+                    "interpreted_mood": meta.interpreted_mood,
+                    "object_count": meta.object_count,
+                    "timestamp": meta.timestamp
                 })
-            
-            # Sort by timestamp descending
-            scenes.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            return scenes[:limit]
+            return scenes
             
         except Exception as e:
             logger.error(f"Error getting recent scenes: {e}")
@@ -340,7 +969,13 @@ class SceneMemory:
             True if deleted, False otherwise
         """
         try:
-            self.collection.delete(ids=[scene_id])
+            with self._write_lock:
+                existing = self.collection.get(ids=[scene_id], include=[])["ids"]
+                self.collection.delete(ids=[scene_id])
+                self._cached_count = max(0, self._cached_count - len(existing))
+                self._recent_synced_count = max(0, self._recent_synced_count - len(existing))
+            if scene_id in self._recent_ids:
+                self._recent_ids.remove(scene_id)
             logger.info(f"Deleted scene {scene_id} from memory")
             return True
         except Exception as e:
@@ -354,22 +989,54 @@ class SceneMemory:
         Returns:
             Number of scenes deleted
         """
-        count = self.collection.count()
-        if count > 0:
+        with self._write_lock:
             # Get all IDs and delete
-            all_ids = self.collection.get()["ids"]
-            self.collection.delete(ids=all_ids)
-            logger.info(f"Cleared {count} scenes from memory")
+            all_ids = self.collection.get(include=[])["ids"]
+            count = len(all_ids)
+            if count > 0:
+                self.collection.delete(ids=all_ids)
+                logger.info(f"Cleared {count} scenes from memory")
+            self._cached_count = 0
+            self._recent_synced_count = 0
+        self._recent_ids.clear()
         return count
     
     def get_stats(self) -> Dict[str, Any]:
         """Get memory statistics."""
         return {
-            "total_scenes": self.collection.count(),
+            "total_scenes": self.count(),
             "collection_name": self.collection_name,
-            "embedding_model": "all-MiniLM-L6-v2"
+            "embedding_model": self.embedding_model
         }
     
+    def _load_recent_ids(self) -> None:
+        """
+        Rebuild the recent-scenes buffer from the collection, sorted by timestamp.
+        
+        Metadata is read page by page and only (timestamp, id) pairs are kept,
+        so the scan never holds every scene's metadata (including any int8
+        embedding codes) at once.
+        """
+        newest: List[Tuple[str, str]] = []
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=RECENT_SCAN_PAGE_SIZE, offset=offset)
+            ids = page["ids"]
+            if not ids:
+                break
+            newest.extend(
+                ((meta or {}).get("timestamp", ""), scene_id)
+                for scene_id, meta in zip(ids, page["metadatas"] or [])
+            )
+            newest = heapq.nlargest(RECENT_SCENES_CAPACITY, newest)
+            offset += len(ids)
+            if len(ids) < RECENT_SCAN_PAGE_SIZE:
+                break
+        
+        self._recent_ids.clear()
+        self._recent_ids.extend(scene_id for _, scene_id in reversed(newest))
+        self._recent_synced_count = offset
+    
     def _extract_lighting_mood(self, lighting: Optional[LightingSetup]) -> str:
         """Extract lighting mood description."""
         if not lighting:
@@ -377,13 +1044,9 @@ class SceneMemory:
         
         moods = []
         if lighting.lights:
-            avg_temp = sum(l.color_temperature for l in lighting.lights) / len(lighting.lights)
-            if avg_temp < 4000:
-                moods.append("warm")
-            elif avg_temp > 5500:
-                moods.append("cool")
-            else:
-                moods.append("neutral")
+            temperatures, _ = _light_arrays(lighting)
+            avg_temp = float(temperatures.mean())
+            moods.append(_classify_color_temperature(avg_temp))
         
         if lighting.hdri_map:
             moods.append("HDRI")
@@ -394,8 +1057,8 @@ class SceneMemory:
         """Get the primary light's color temperature."""
         if lighting and lighting.lights:
             # Find the brightest light
-            brightest = max(lighting.lights, key=lambda l: l.intensity)
-            return brightest.color_temperature
+            temperatures, intensities = _light_arrays(lighting)
+            return int(temperatures[intensities.argmax()])
         return None
     
     def _serialize_scene_data(
@@ -406,15 +1069,16 @@ class SceneMemory:
     ) -> str:
         """Serialize scene data to JSON."""
         data = {
-            "objects": [obj.model_dump() for obj in objects],
-            "lighting": lighting.model_dump() if lighting else None,
-            "camera": camera.model_dump() if camera else None
+            "objects": _OBJECTS_ADAPTER.dump_python(objects, mode="json"),
+            "lighting": _LIGHTING_ADAPTER.dump_python(lighting, mode="json"),
+            "camera": _CAMERA_ADAPTER.dump_python(camera, mode="json")
         }
-        return json.dumps(data)
+        return orjson.dumps(data).decode()
 
 
 # Global instance (lazy initialization)
 _scene_memory: Optional[SceneMemory] = None
+_scene_memory_lock = threading.Lock()
 
 
 def get_scene_memory(
@@ -431,7 +1095,47 @@ def get_scene_memory(
     """
     global _scene_memory
     
+    # Double-checked so concurrent first requests load the model only once
     if _scene_memory is None:
-        _scene_memory = SceneMemory(persist_directory=persist_directory)
+        with _scene_memory_lock:
+            if _scene_memory is None:
+                _scene_memory = SceneMemory(
+                    persist_directory=persist_directory,
+                    int8_rerank=get_settings().scene_memory_int8_rerank
+                )
     
     return _scene_memory
+
+
+def _reset_after_fork() -> None:
+    """
+    Drop inherited ChromaDB state in a forked child process.
+    
+    The parent's SQLite handles and writer thread don't survive a fork,
+    so each worker lazily opens its own client and SceneMemory.
+    """
+    global _scene_memory, _scene_memory_lock, _clients_lock
+    _scene_memory = None
+    _scene_memory_lock = threading.Lock()
+    _clients.clear()
+    _clients_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def shutdown_scene_memory(timeout: Optional[float] = 10.0) -> None:
+    """
+    Flush queued scene writes of the global SceneMemory, if it was created.
+    
+    Args:
+        timeout: Maximum seconds to wait for pending writes
+    """
+    if _scene_memory is not None and not _scene_memory.flush(timeout=timeout):
+        logger.warning("Timed out flushing scene memory writes")
+
+
+# Background writes run on a daemon thread; flush them on a normal
+# interpreter exit so scripts and workers don't lose queued scenes
+atexit.register(shutdown_scene_memory)
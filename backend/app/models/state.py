@@ -1,8 +1,8 @@
 """State models for the multi-agent Moo Director system."""
-from typing import TypedDict, List, Optional, Dict, Any, Annotated
-from pydantic import BaseModel, Field
+from typing import TypedDict, List, Optional, Dict, Any, Annotated, NamedTuple
+from pydantic import BaseModel, Field, GetCoreSchemaHandler
+from pydantic_core import core_schema
 from enum import Enum
-import operator
 
 
 class AgentType(str, Enum):
@@ -25,14 +25,32 @@ class WorkflowStatus(str, Enum):
     FAILED = "failed"
 
 
-class Coordinate3D(BaseModel):
-    """3D coordinate with Z-up convention."""
+class Coordinate3D(NamedTuple):
+    """
+    3D coordinate with Z-up convention.
+    
+    Tuple-backed and immutable; use ``_replace`` to move a coordinate.
+    Validates from tuples, lists or ``{"x", "y", "z"}`` dicts and always
+    serializes back to the dict form the API and frontend expect.
+    """
     x: float = 0.0
     y: float = 0.0
     z: float = 0.0
     
     def to_dict(self) -> Dict[str, float]:
         return {"x": self.x, "y": self.y, "z": self.z}
+    
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls,
+        source: Any,
+        handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        schema = handler(source)
+        schema["serialization"] = core_schema.plain_serializer_function_ser_schema(
+            cls.to_dict
+        )
+        return schema
 
 
 class BoundingBox(BaseModel):
@@ -64,7 +82,7 @@ class SceneObject(BaseModel):
     asset_path: Optional[str] = None
     position: Coordinate3D = Field(default_factory=Coordinate3D)
     rotation: Coordinate3D = Field(default_factory=Coordinate3D)
-    scale: Coordinate3D = Field(default_factory=lambda: Coordinate3D(x=1, y=1, z=1))
+    scale: Coordinate3D = Field(default_factory=lambda: Coordinate3D(x=1.0, y=1.0, z=1.0))
     bounding_box: BoundingBox = Field(default_factory=BoundingBox)
     material: Optional[Material] = None
     parent_id: Optional[str] = None
@@ -125,12 +143,25 @@ class MasterPlan(BaseModel):
 
 
 def merge_lists(left: List[Any], right: List[Any]) -> List[Any]:
-    """Merge two lists, appending right to left."""
+    """
+    Merge two lists, appending right to left.
+    
+    Returns an input unchanged when the other side is empty instead of
+    copying. Never mutates ``left``: checkpoints keep references to it.
+    """
+    if not right:
+        return left
+    if not left:
+        return right
     return left + right
 
 
 def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
-    """Merge two dicts, right values override left."""
+    """Merge two dicts, right values override left (no copy if either is empty)."""
+    if not right:
+        return left
+    if not left:
+        return right
     return {**left, **right}
 
 
@@ -173,10 +204,10 @@ class AgentState(TypedDict):
     max_iterations: int
     
     # Message history for context (accumulated)
-    messages: Annotated[List[Dict[str, Any]], operator.add]
+    messages: Annotated[List[Dict[str, Any]], merge_lists]
     
     # Error tracking (accumulated)
-    errors: Annotated[List[str], operator.add]
+    errors: Annotated[List[str], merge_lists]
     
     # Final output
     final_report: Optional[str]
@@ -0,0 +1,188 @@
+"""
+Celery tasks for running workflows on a separate worker pool.
+
+Multi-iteration workflows can take minutes. When CELERY_BROKER_URL is set,
+/scene/create-async submits them to Celery workers instead of running them
+in the API process, and job status is read from the Celery result backend
+so every API worker sees every job.
+
+Install Celery with `pip install -r requirements-celery.txt`, then start a
+worker with:
+    celery -A app.tasks worker --loglevel=info
+"""
+from typing import Any, Dict, Optional
+import logging
+
+from groq import APIConnectionError, InternalServerError, RateLimitError
+
+try:
+    from celery import Celery
+    from celery.result import AsyncResult
+    from celery.signals import worker_process_shutdown, worker_shutdown
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    Celery = None
+    AsyncResult = None
+
+from .config import get_settings
+from .memory.scene_memory import shutdown_scene_memory
+from .workflow.graph import run_workflow_sync
+
+logger = logging.getLogger(__name__)
+
+# Custom state recorded when a job is submitted. Celery reports PENDING for
+# any task ID it has no record of, so only QUEUED marks a known waiting job.
+QUEUED_STATE = "QUEUED"
+
+# Celery task states mapped to JobStatus.status values
+_JOB_STATUSES = {
+    QUEUED_STATE: "pending",
+    "RECEIVED": "pending",
+    "STARTED": "running",
+    "PROGRESS": "running",
+    "RETRY": "running",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+    "REVOKED": "failed",
+}
+
+# Errors worth retrying a workflow for: network failures, provider rate
+# limits and provider 5xx responses. Anything else would fail again.
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    APIConnectionError,  # includes APITimeoutError
+    RateLimitError,
+    InternalServerError,
+)
+
+
+def scene_data_from_result(result: Dict[str, Any], json_mode: bool = False) -> Dict[str, Any]:
+    """
+    Extract the scene payload returned to clients from a final workflow state.
+    
+    Args:
+        result: The final workflow state
+        json_mode: Dump models to JSON-compatible types (for the Celery result backend)
+    
+    Returns:
+        Dict with objects, lighting, camera, validation_passed and final_report
+    """
+    mode = "json" if json_mode else "python"
+    lighting = result.get("lighting_setup")
+    camera = result.get("camera_setup")
+    return {
+        "objects": [
+            obj.model_dump(mode=mode) if hasattr(obj, 'model_dump') else obj
+            for obj in result.get("scene_objects", [])
+        ],
+        "lighting": lighting.model_dump(mode=mode) if lighting else None,
+        "camera": camera.model_dump(mode=mode) if camera else None,
+        "validation_passed": result.get("validation_passed"),
+        "final_report": result.get("final_report")
+    }
+
+
+def _create_celery_app() -> Optional["Celery"]:
+    """Create the Celery app if a broker is configured and Celery is installed."""
+    settings = get_settings()
+    if not settings.celery_broker_url:
+        return None
+    if not CELERY_AVAILABLE:
+        logger.warning("CELERY_BROKER_URL is set but celery is not installed - running jobs in-process")
+        return None
+    
+    app = Celery(
+        "moo_director",
+        broker=settings.celery_broker_url,
+        backend=settings.celery_result_backend or settings.celery_broker_url
+    )
+    app.conf.update(
+        task_serializer="json",
+        result_serializer="json",
+        accept_content=["json"],
+        task_track_started=True,
+        # Workflows are long; don't let a worker hoard queued jobs
+        worker_prefetch_multiplier=1,
+        task_acks_late=True,
+    )
+    return app
+
+
+celery_app = _create_celery_app()
+
+
+if celery_app is not None:
+    @celery_app.task(
+        bind=True,
+        name="moo_director.run_workflow",
+        autoretry_for=TRANSIENT_ERRORS,
+        max_retries=3,
+        retry_backoff=True,
+    )
+    def run_workflow_task(self, prompt: str, max_iterations: int) -> Dict[str, Any]:
+        """Run a workflow on a Celery worker and return the scene payload."""
+        self.update_state(state="PROGRESS", meta={"progress": "Starting workflow..."})
+        try:
+            result = run_workflow_sync(prompt, max_iterations, thread_id=self.request.id)
+        except Exception as e:
+            logger.error(f"Workflow task {self.request.id} failed: {e}")
+            raise
+        return scene_data_from_result(result, json_mode=True)
+    
+    @worker_process_shutdown.connect
+    @worker_shutdown.connect
+    def _flush_scene_memory(**kwargs: Any) -> None:
+        """Write queued scenes before a worker exits (prefork children skip atexit)."""
+        shutdown_scene_memory()
+else:
+    run_workflow_task = None
+
+
+def submit_workflow_job(job_id: str, prompt: str, max_iterations: int) -> bool:
+    """
+    Submit a workflow to the Celery worker pool.
+    
+    Returns:
+        True if submitted, False if Celery is not configured
+    """
+    if run_workflow_task is None:
+        return False
+    # Record the job before queueing it so status lookups can tell it apart
+    # from an unknown ID (the worker overwrites this state once it starts)
+    celery_app.backend.store_result(job_id, {"progress": "Job queued"}, QUEUED_STATE)
+    run_workflow_task.apply_async(args=(prompt, max_iterations), task_id=job_id)
+    return True
+
+
+def get_workflow_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a Celery job's status from the result backend.
+    
+    Returns:
+        Dict with status, progress, result and error, or None if Celery is not
+        configured or the job is unknown (never submitted, or its result expired)
+    """
+    if celery_app is None:
+        return None
+    
+    task = AsyncResult(job_id, app=celery_app)
+    state = task.state
+    if state == "PENDING":
+        return None
+    info = task.info
+    job: Dict[str, Any] = {
+        "status": _JOB_STATUSES.get(state, "running"),
+        "progress": None,
+        "result": None,
+        "error": None
+    }
+    if state == "SUCCESS":
+        job["result"] = info
+        job["progress"] = "Done"
+    elif state in ("FAILURE", "REVOKED"):
+        job["error"] = str(info)
+    elif isinstance(info, dict):
+        job["progress"] = info.get("progress")
+    return job
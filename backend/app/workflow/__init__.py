@@ -1,4 +1,4 @@
 # Workflow package
-from .graph import create_workflow_graph, run_workflow
+from .graph import create_workflow_graph, run_workflow, get_graph_cache
 
-__all__ = ["create_workflow_graph", "run_workflow"]
+__all__ = ["create_workflow_graph", "run_workflow", "get_graph_cache"]
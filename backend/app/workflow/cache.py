@@ -0,0 +1,195 @@
+"""
+Semantic cache for workflow node outputs.
+
+Near-duplicate requests (same prompt, reworded prompt) re-derive the same
+master plan. GraphCache keeps recent node updates keyed by an embedding of
+the request and returns a cached update when a new request is similar
+enough, skipping the node (and its LLM call) entirely.
+"""
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import copy
+import logging
+import threading
+
+import numpy as np
+from langchain_core.runnables import RunnableConfig
+
+from ..models.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_MAX_ENTRIES = 256
+
+EmbedFunction = Callable[[List[str]], Sequence[Sequence[float]]]
+
+# Returns (text to embed, exact upstream key), or None to bypass the cache
+FingerprintFunction = Callable[[AgentState], Optional[Tuple[str, str]]]
+
+# Adapts a cached update to the current request's state
+HitFunction = Callable[[Dict[str, Any], AgentState], Dict[str, Any]]
+
+
+class GraphCache:
+    """
+    In-process semantic cache of node state updates.
+    
+    Entries are grouped by (node, upstream key); within a group a lookup
+    hits when the cosine similarity between the request embeddings is at
+    least the threshold. Without an embedding function only exact
+    (normalized) text matches hit.
+    
+    lookup() and store() may embed text, so call them off the event loop.
+    """
+    
+    def __init__(
+        self,
+        embed: Optional[EmbedFunction] = None,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        embed_factory: Optional[Callable[[], Optional[EmbedFunction]]] = None
+    ):
+        """
+        Args:
+            embed: Embedding function for request texts
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum entries kept per (node, upstream key)
+            embed_factory: Creates the embedding function on first use instead
+                           (e.g. from the scene memory, which loads a model)
+        """
+        self.embed = embed
+        self._embed_factory = embed_factory
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._entries: Dict[Tuple[str, str], List[Tuple[str, Optional[np.ndarray], Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _vector(self, text: str) -> Optional[np.ndarray]:
+        """Embed and L2-normalize a request text (None if embeddings are unavailable)."""
+        try:
+            if self.embed is None and self._embed_factory is not None:
+                self.embed = self._embed_factory()
+                self._embed_factory = None
+            if self.embed is None:
+                return None
+            vector = np.asarray(self.embed([text])[0], dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"GraphCache embedding failed, using exact matching: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def lookup(self, node: str, text: str, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Find a cached update for a request.
+        
+        Returns:
+            (a copy of the cached update or None, the request's embedding for store())
+        """
+        normalized = text.strip().lower()
+        vector = self._vector(normalized)
+        
+        with self._lock:
+            entries = self._entries.get((node, key), [])
+            match = next((update for cached_text, _, update in entries if cached_text == normalized), None)
+            
+            if match is None and vector is not None:
+                candidates = [(v, update) for _, v, update in entries if v is not None and v.shape == vector.shape]
+                if candidates:
+                    similarities = np.stack([v for v, _ in candidates]) @ vector
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.threshold:
+                        match = candidates[best][1]
+            
+            if match is None:
+                self.misses[node] += 1
+                return None, vector
+            self.hits[node] += 1
+        
+        return copy.deepcopy(match), vector
+    
+    def store(
+        self,
+        node: str,
+        text: str,
+        key: str,
+        update: Dict[str, Any],
+        vector: Optional[np.ndarray] = None
+    ) -> None:
+        """Cache a node update for a request."""
+        entry = (text.strip().lower(), vector, copy.deepcopy(update))
+        with self._lock:
+            entries = self._entries.setdefault((node, key), [])
+            entries.append(entry)
+            if len(entries) > self.max_entries:
+                del entries[0]
+    
+    def clear(self) -> None:
+        """Drop all cached updates and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits.clear()
+            self.misses.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts per node."""
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "entries": sum(len(entries) for entries in self._entries.values())
+            }
+
+
+def cached_node(
+    cache: Callable[[], Optional[GraphCache]],
+    node: str,
+    fingerprint: FingerprintFunction,
+    cacheable: Callable[[Dict[str, Any]], bool] = lambda update: True,
+    on_hit: HitFunction = lambda update, state: update
+):
+    """
+    Decorate a node so near-duplicate requests reuse its earlier update.
+    
+    Runs with `configurable.use_memory` set to False bypass the cache, so
+    they never load the embedding model.
+    
+    Args:
+        cache: Returns the GraphCache to use (None disables caching)
+        node: Node name the entries are stored under
+        fingerprint: Maps the state to (text to embed, exact upstream key),
+                     or None to always run the node
+        cacheable: Whether a node update may be cached (e.g. not failures)
+        on_hit: Adapts a cached update to the current state (e.g. its prompt)
+    """
+    def decorator(func):
+        async def wrapper(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+            graph_cache = cache()
+            use_memory = ((config or {}).get("configurable") or {}).get("use_memory", True)
+            request = fingerprint(state) if graph_cache and use_memory else None
+            if request is None:
+                return await func(state)
+            
+            text, key = request
+            # Embedding runs the model, so keep it off the event loop
+            cached, vector = await asyncio.to_thread(graph_cache.lookup, node, text, key)
+            if cached is not None:
+                logger.info(f"GraphCache hit for {node} node")
+                return on_hit(cached, state)
+            
+            update = await func(state)
+            if cacheable(update):
+                await asyncio.to_thread(graph_cache.store, node, text, key, update, vector)
+            return update
+        
+        # Not functools.wraps: LangGraph inspects the signature (which
+        # __wrapped__ would replace) to decide whether to pass the config
+        wrapper.__name__ = getattr(func, "__name__", node)
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    
+    return decorator
@@ -0,0 +1,78 @@
+"""
+In-process checkpointer shared by workflow runs.
+
+A single MemorySaver lets runs that reuse a thread_id resume from that
+thread's checkpoints. The API gives every job its own thread_id, though,
+so an unbounded saver would keep every run's state forever; this one
+evicts the least recently written threads beyond a fixed capacity.
+"""
+from collections import OrderedDict
+from typing import Optional
+import threading
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import MemorySaver
+
+DEFAULT_MAX_THREADS = 1000
+
+
+class BoundedMemorySaver(MemorySaver):
+    """MemorySaver that keeps checkpoints for at most max_threads threads."""
+    
+    def __init__(self, max_threads: int = DEFAULT_MAX_THREADS, **kwargs):
+        """
+        Args:
+            max_threads: Number of most recently written threads to keep
+        """
+        super().__init__(**kwargs)
+        self.max_threads = max(1, max_threads)
+        self._thread_order: "OrderedDict[str, None]" = OrderedDict()
+        # aput/aput_writes run put/put_writes on executor threads
+        self._lock = threading.RLock()
+    
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            self._touch(config["configurable"]["thread_id"])
+            return saved
+    
+    def put_writes(self, config: RunnableConfig, writes, task_id: str) -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id)
+    
+    def delete_thread(self, thread_id: str) -> None:
+        """Drop all checkpoints and pending writes of a thread."""
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            for key in [key for key in list(self.writes) if key[0] == thread_id]:
+                del self.writes[key]
+            self._thread_order.pop(thread_id, None)
+    
+    def _touch(self, thread_id: str) -> None:
+        """Mark a thread as most recently written and evict the oldest ones."""
+        self._thread_order[thread_id] = None
+        self._thread_order.move_to_end(thread_id)
+        while len(self._thread_order) > self.max_threads:
+            oldest, _ = self._thread_order.popitem(last=False)
+            self.delete_thread(oldest)
+
+
+_memory_checkpointer: Optional[BoundedMemorySaver] = None
+_memory_checkpointer_lock = threading.Lock()
+
+
+def get_memory_checkpointer(max_threads: int = DEFAULT_MAX_THREADS) -> BoundedMemorySaver:
+    """Return the process-wide in-memory checkpointer."""
+    global _memory_checkpointer
+    if _memory_checkpointer is None:
+        with _memory_checkpointer_lock:
+            if _memory_checkpointer is None:
+                _memory_checkpointer = BoundedMemorySaver(max_threads=max_threads)
+    return _memory_checkpointer
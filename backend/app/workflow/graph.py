@@ -2,16 +2,24 @@
 LangGraph workflow for the Moo Director multi-agent system.
 Implements the agent collaboration and agentic workflow.
 """
-from typing import Dict, Any, Optional, Literal
+from typing import (
+    Dict, Any, List, Optional, Literal, Set, Type, Coroutine, Callable, Awaitable,
+    Annotated, get_origin, get_type_hints
+)
+from collections import Counter
+import atexit
 import logging
 import asyncio
+import threading
 import uuid
 
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 
 from ..models.state import AgentState, WorkflowStatus, MasterPlan
 from ..agents import (
+    BaseAgent,
     OrchestratorAgent,
     ArchitectAgent,
     LibrarianAgent,
@@ -19,96 +27,210 @@ from ..agents import (
     CinematographerAgent,
     CriticAgent
 )
+from ..config import get_settings
 from ..memory.scene_memory import get_scene_memory
+from .cache import GraphCache, cached_node
+from .checkpointer import get_memory_checkpointer
 
 logger = logging.getLogger(__name__)
 
-# Initialize all agents
-orchestrator = OrchestratorAgent()
-librarian = LibrarianAgent()
-architect = ArchitectAgent()
-material_scientist = MaterialScientistAgent()
-cinematographer = CinematographerAgent()
-critic = CriticAgent()
+# Agent classes, keyed by node name
+AGENT_CLASSES: Dict[str, Type[BaseAgent]] = {
+    "orchestrator": OrchestratorAgent,
+    "librarian": LibrarianAgent,
+    "architect": ArchitectAgent,
+    "material_scientist": MaterialScientistAgent,
+    "cinematographer": CinematographerAgent,
+    "critic": CriticAgent,
+}
+
+# Agent instances, created by init_agents() at startup or on first use
+AGENTS: Dict[str, BaseAgent] = {}
+
+
+def get_agent(name: str) -> BaseAgent:
+    """Return the agent for a node, creating it if init_agents() hasn't run."""
+    agent = AGENTS.get(name)
+    if agent is None:
+        agent = AGENTS[name] = AGENT_CLASSES[name]()
+    return agent
+
+
+async def init_agents() -> Dict[str, BaseAgent]:
+    """
+    Create all agents concurrently.
+    
+    Called from the FastAPI lifespan so construction happens after settings
+    and tracing are configured, not at import time.
+    
+    Returns:
+        The agents, keyed by node name
+    """
+    missing = [name for name in AGENT_CLASSES if name not in AGENTS]
+    agents = await asyncio.gather(*(asyncio.to_thread(AGENT_CLASSES[name]) for name in missing))
+    for name, agent in zip(missing, agents):
+        AGENTS.setdefault(name, agent)
+    return AGENTS
+
+NodeFunction = Callable[[AgentState], Awaitable[Dict[str, Any]]]
 
 
-async def orchestrator_node(state: AgentState) -> Dict[str, Any]:
-    """Orchestrator node - decomposes tasks and coordinates."""
-    logger.info("Executing Orchestrator node")
-    return await orchestrator.process(state)
+def _agent_node(name: str, label: str, description: str) -> NodeFunction:
+    """Create a node that runs one agent."""
+    async def node(state: AgentState) -> Dict[str, Any]:
+        logger.info("Executing %s node", label)
+        return await get_agent(name).process(state)
+    
+    node.__name__ = f"{name}_node"
+    node.__doc__ = description
+    return node
+
+
+_graph_cache: Optional[GraphCache] = None
+
+
+def get_graph_cache() -> Optional[GraphCache]:
+    """Return the semantic node cache (None when disabled)."""
+    global _graph_cache
+    settings = get_settings()
+    if not settings.graph_cache_enabled:
+        return None
+    if _graph_cache is None:
+        # The scene memory (and its model) is only loaded on the first lookup,
+        # which runs in a worker thread
+        _graph_cache = GraphCache(
+            threshold=settings.graph_cache_threshold,
+            embed_factory=lambda: get_scene_memory().embedding_function
+        )
+    return _graph_cache
 
 
-async def librarian_node(state: AgentState) -> Dict[str, Any]:
-    """Librarian node - fetches assets."""
-    logger.info("Executing Librarian node")
-    return await librarian.process(state)
+def _planning_fingerprint(state: AgentState) -> Optional[tuple]:
+    """Cache only the initial plan: revisions depend on the Critic's findings."""
+    if state.get("workflow_status") == WorkflowStatus.REVISION or not state.get("user_prompt"):
+        return None
+    return state["user_prompt"], get_agent("orchestrator").model_name
 
 
-async def architect_node(state: AgentState) -> Dict[str, Any]:
-    """Architect node - places objects in 3D space."""
-    logger.info("Executing Architect node")
-    return await architect.process(state)
+def _is_plan(update: Dict[str, Any]) -> bool:
+    return update.get("master_plan") is not None and update.get("workflow_status") == WorkflowStatus.IN_PROGRESS
 
 
-async def material_scientist_node(state: AgentState) -> Dict[str, Any]:
-    """Material Scientist node - applies materials."""
-    logger.info("Executing Material Scientist node")
-    return await material_scientist.process(state)
+def _reuse_plan(update: Dict[str, Any], state: AgentState) -> Dict[str, Any]:
+    """Attach a cached master plan to the current prompt."""
+    plan = update["master_plan"].model_copy(update={"original_prompt": state["user_prompt"]})
+    return {
+        **update,
+        "master_plan": plan,
+        "messages": [{
+            "agent": "Orchestrator",
+            "action": "created_master_plan",
+            "content": f"Reused the plan of a similar request: '{plan.interpreted_mood}' mood with {len(plan.required_objects)} objects"
+        }]
+    }
+
+
+orchestrator_node = cached_node(get_graph_cache, "orchestrator", _planning_fingerprint, _is_plan, _reuse_plan)(
+    _agent_node("orchestrator", "Orchestrator", "Orchestrator node - decomposes tasks and coordinates.")
+)
+librarian_node = _agent_node("librarian", "Librarian", "Librarian node - fetches assets.")
+architect_node = _agent_node("architect", "Architect", "Architect node - places objects in 3D space.")
+material_scientist_node = _agent_node("material_scientist", "Material Scientist", "Material Scientist node - applies materials.")
+cinematographer_node = _agent_node("cinematographer", "Cinematographer", "Cinematographer node - sets up lighting and camera.")
 
 
-async def cinematographer_node(state: AgentState) -> Dict[str, Any]:
-    """Cinematographer node - sets up lighting and camera."""
-    logger.info("Executing Cinematographer node")
-    return await cinematographer.process(state)
+# AgentState reducers (from the Annotated hints), keyed by state key
+_STATE_REDUCERS: Dict[str, Callable[[Any, Any], Any]] = {
+    key: hint.__metadata__[-1]
+    for key, hint in get_type_hints(AgentState, include_extras=True).items()
+    if get_origin(hint) is Annotated
+}
+
+
+def _apply_update(
+    state: Dict[str, Any],
+    combined: Dict[str, Any],
+    update: Dict[str, Any]
+) -> None:
+    """
+    Fold an agent's partial update into the working state and the node's combined update.
+    
+    Keys with an AgentState reducer are merged with it, as LangGraph would
+    between nodes; all other keys are replaced.
+    """
+    for key, value in update.items():
+        reducer = _STATE_REDUCERS.get(key)
+        if reducer is None:
+            state[key] = value
+            combined[key] = value
+            continue
+        state[key] = reducer(state[key], value) if state.get(key) is not None else value
+        combined[key] = reducer(combined[key], value) if key in combined else value
 
 
 async def critic_node(state: AgentState) -> Dict[str, Any]:
-    """Critic node - validates the scene."""
+    """
+    Critic node - validates the scene and plans any revision in the same step.
+    
+    A revision only depends on the Critic's findings, so the Orchestrator
+    routes it right away instead of in a separate step (saving a graph
+    superstep and checkpoint write per failed iteration).
+    """
     logger.info("Executing Critic node")
-    return await critic.process(state)
+    update = await get_agent("critic").process(state)
+    if update.get("workflow_status") != WorkflowStatus.REVISION:
+        return update
+    
+    working: Dict[str, Any] = dict(state)
+    combined: Dict[str, Any] = {}
+    _apply_update(working, combined, update)
+    _apply_update(working, combined, await get_agent("orchestrator").process(working))
+    return combined
 
 
 def route_from_orchestrator(state: AgentState) -> str:
     """Route from orchestrator to the next agent."""
-    next_agent = state.get("current_agent", "librarian")
-    status = state.get("workflow_status")
-    
-    if status == WorkflowStatus.FAILED:
+    if state.get("workflow_status") == WorkflowStatus.FAILED:
         return END
     
-    logger.info(f"Routing from Orchestrator to: {next_agent}")
+    next_agent = state.get("current_agent", "librarian")
+    logger.info("Routing from Orchestrator to: %s", next_agent)
     return next_agent
 
 
+# Critic outcome -> (next node, log message); any other status ends the workflow
+_CRITIC_ROUTES = {
+    WorkflowStatus.COMPLETED: (END, "Validation passed, ending workflow"),
+    WorkflowStatus.REVISION: ("orchestrator", "Validation failed, routing to Orchestrator for revision"),
+}
+_CRITIC_DEFAULT_ROUTE = (END, "Workflow ending")
+
+
 def route_from_critic(state: AgentState) -> str:
     """Route from critic - either complete or revision."""
-    status = state.get("workflow_status")
-    passed = state.get("validation_passed", False)
-    
-    if passed or status == WorkflowStatus.COMPLETED:
-        logger.info("Validation passed, ending workflow")
-        return END
-    elif status == WorkflowStatus.REVISION:
-        logger.info("Validation failed, routing to Orchestrator for revision")
-        return "orchestrator"
+    if state.get("validation_passed", False):
+        route, message = _CRITIC_ROUTES[WorkflowStatus.COMPLETED]
+    elif state.get("workflow_status") == WorkflowStatus.IN_PROGRESS:
+        # The critic node already planned the revision
+        return route_from_orchestrator(state)
     else:
-        logger.info("Workflow ending")
-        return END
+        route, message = _CRITIC_ROUTES.get(state.get("workflow_status"), _CRITIC_DEFAULT_ROUTE)
+    
+    logger.info(message)
+    return route
 
 
 def route_standard(state: AgentState) -> str:
     """Standard routing based on current_agent in state."""
-    next_agent = state.get("current_agent")
-    status = state.get("workflow_status")
-    
-    if status == WorkflowStatus.FAILED:
+    if state.get("workflow_status") == WorkflowStatus.FAILED:
         return END
     
-    if next_agent:
-        logger.info(f"Routing to: {next_agent}")
-        return next_agent
+    next_agent = state.get("current_agent")
+    if not next_agent:
+        return END
     
-    return END
+    logger.info("Routing to: %s", next_agent)
+    return next_agent
 
 
 def create_workflow_graph() -> StateGraph:
@@ -122,7 +244,8 @@ def create_workflow_graph() -> StateGraph:
     4. Material Scientist applies textures
     5. Cinematographer sets lighting/camera
     6. Critic validates
-    7. If issues: back to Orchestrator for revision
+    7. If issues: the Orchestrator plans the revision within the Critic
+       step and the responsible agent onwards re-run
     8. If passed: complete
     """
     
@@ -195,12 +318,17 @@ def create_workflow_graph() -> StateGraph:
         }
     )
     
-    # Critic can either end or loop back for revision
+    # Critic either ends or routes straight to the agent doing the revision
     workflow.add_conditional_edges(
         "critic",
         route_from_critic,
         {
             "orchestrator": "orchestrator",
+            "librarian": "librarian",
+            "architect": "architect",
+            "material_scientist": "material_scientist",
+            "cinematographer": "cinematographer",
+            "critic": "critic",
             END: END
         }
     )
@@ -218,6 +346,15 @@ def compile_workflow(checkpointer: Optional[MemorySaver] = None):
     return graph.compile()
 
 
+# Compiled once at import; the graph itself is stateless between runs
+_compiled_workflow = compile_workflow()
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Return the bounded in-process checkpointer shared by all thread_id runs."""
+    return get_memory_checkpointer(get_settings().checkpoint_max_threads)
+
+
 async def run_workflow(
     user_prompt: str,
     max_iterations: int = 3,
@@ -257,23 +394,25 @@ async def run_workflow(
         "final_report": None
     }
     
-    # Compile and run the workflow
+    # Run the prebuilt workflow (attaching a checkpointer is a shallow copy, not a rebuild)
+    # use_memory lets nodes (e.g. the plan cache) skip loading scene memory
+    config: Dict[str, Any] = {"configurable": {"use_memory": store_in_memory}}
     if thread_id:
-        checkpointer = MemorySaver()
-        app = compile_workflow(checkpointer)
-        config = {"configurable": {"thread_id": thread_id}}
-        
-        # Use ainvoke to get the full final state (not astream which gives partial events)
-        final_state = await app.ainvoke(initial_state, config)
+        app = _compiled_workflow.copy(update={"checkpointer": get_checkpointer()})
+        config["configurable"]["thread_id"] = thread_id
     else:
-        app = compile_workflow()
-        final_state = await app.ainvoke(initial_state)
+        app = _compiled_workflow
+    
+    # "values" mode yields the full state after every step; the last one is final
+    final_state: Dict[str, Any] = initial_state
+    async for state in app.astream(initial_state, config, stream_mode="values"):
+        final_state = state
     
     logger.info(f"Workflow completed with status: {final_state.get('workflow_status')}")
     
-    # Store completed scene in vector memory
+    # Store completed scene in vector memory without delaying the response
     if store_in_memory and final_state.get("workflow_status") == WorkflowStatus.COMPLETED:
-        await _store_scene_in_memory(scene_id, final_state)
+        _run_in_background(_store_scene_in_memory(scene_id, dict(final_state)))
     
     # Add scene_id to the result
     final_state["scene_id"] = scene_id
@@ -281,6 +420,26 @@ async def run_workflow(
     return final_state
 
 
+# Background tasks are referenced here until done so they aren't garbage collected
+_background_tasks: Set["asyncio.Task[Any]"] = set()
+
+
+def _run_in_background(coro: Coroutine[Any, Any, Any]) -> "asyncio.Task[Any]":
+    """Schedule a coroutine on the running loop without awaiting it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def wait_for_background_tasks() -> None:
+    """Wait for pending background work (e.g. memory stores) on the current loop."""
+    loop = asyncio.get_running_loop()
+    pending = [task for task in _background_tasks if task.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
 async def _store_scene_in_memory(scene_id: str, state: Dict[str, Any]) -> None:
     """
     Store a completed scene in vector memory for future retrieval.
@@ -290,15 +449,16 @@ async def _store_scene_in_memory(scene_id: str, state: Dict[str, Any]) -> None:
         state: The final workflow state
     """
     try:
-        memory = get_scene_memory()
+        # First use loads the embedding model, so keep it off the event loop
+        memory = await asyncio.to_thread(get_scene_memory)
         
         # Extract validation score from issues (approximate)
-        validation_issues = state.get("validation_issues", [])
-        error_count = sum(1 for i in validation_issues if getattr(i, 'severity', '') == 'error')
-        warning_count = sum(1 for i in validation_issues if getattr(i, 'severity', '') == 'warning')
+        severities = Counter(issue.severity for issue in state.get("validation_issues") or [])
+        error_count = severities["error"]
+        warning_count = severities["warning"]
         validation_score = max(0, 100 - (error_count * 15) - (warning_count * 5))
         
-        memory.store_scene(
+        await memory.store_scene_async(
             scene_id=scene_id,
             user_prompt=state.get("user_prompt", ""),
             master_plan=state.get("master_plan"),
@@ -309,16 +469,55 @@ async def _store_scene_in_memory(scene_id: str, state: Dict[str, Any]) -> None:
             validation_score=validation_score
         )
         
-        logger.info(f"Stored scene {scene_id} in vector memory")
+        logger.info("Stored scene %s in vector memory", scene_id)
         
     except Exception as e:
-        logger.error(f"Failed to store scene in memory: {e}")
+        logger.error("Failed to store scene in memory: %s", e)
+
+
+# Event loop reused across run_workflow_sync calls, one per calling thread
+# (asyncio.Runner isn't thread-safe, e.g. under Celery thread pools)
+_sync_runners = threading.local()
+_all_sync_runners: List[asyncio.Runner] = []
+
+
+def _get_sync_runner() -> asyncio.Runner:
+    """Return the calling thread's runner, creating it on first use."""
+    runner = getattr(_sync_runners, "runner", None)
+    if runner is None:
+        runner = _sync_runners.runner = asyncio.Runner()
+        _all_sync_runners.append(runner)
+    return runner
+
+
+@atexit.register
+def _close_sync_runners() -> None:
+    """Close the sync runners' event loops at interpreter exit."""
+    for runner in _all_sync_runners:
+        try:
+            runner.close()
+        except Exception as e:
+            logger.warning("Failed to close workflow event loop: %s", e)
+    _all_sync_runners.clear()
 
 
 # Synchronous wrapper for non-async contexts
 def run_workflow_sync(
     user_prompt: str,
-    max_iterations: int = 3
+    max_iterations: int = 3,
+    thread_id: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Synchronous wrapper for run_workflow."""
-    return asyncio.run(run_workflow(user_prompt, max_iterations))
+    """
+    Synchronous wrapper for run_workflow.
+    
+    Calls from the same thread reuse one event loop, so loop-bound clients
+    (e.g. the LLM's async HTTP pool) are reused instead of rebuilt per call.
+    """
+    async def _run() -> Dict[str, Any]:
+        result = await run_workflow(user_prompt, max_iterations, thread_id=thread_id)
+        # The loop only runs during these calls, so let the memory store reach
+        # the scene memory's write queue (flushed at exit, see shutdown_scene_memory)
+        await wait_for_background_tasks()
+        return result
+    
+    return _get_sync_runner().run(_run())
@@ -9,8 +9,23 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+# Installed by uvicorn[standard]; fall back to the pure-Python loop/parser
+try:
+    import uvloop  # noqa: F401
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import httptools  # noqa: F401
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
 from app.api import router
 from app.config import get_settings
+from app.memory.scene_memory import shutdown_scene_memory
+from app.workflow.graph import init_agents, wait_for_background_tasks
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +47,8 @@ def _configure_langsmith(settings) -> bool:
         os.environ["LANGCHAIN_API_KEY"] = settings.langchain_api_key
         os.environ["LANGCHAIN_PROJECT"] = settings.langchain_project
         os.environ["LANGCHAIN_ENDPOINT"] = settings.langchain_endpoint
+        # Run tracing callbacks in the background instead of blocking LLM calls
+        os.environ.setdefault("LANGCHAIN_CALLBACKS_BACKGROUND", "true")
         return True
     return False
 
@@ -47,16 +64,29 @@ async def lifespan(app: FastAPI):
     if not settings.groq_api_key:
         logger.warning("GROQ_API_KEY not set - LLM features will not work")
     
+    if (settings.workers > 1 or settings.celery_broker_url) and not settings.chroma_server_url:
+        logger.warning(
+            "Several processes write scene memory but CHROMA_SERVER_URL is not set - "
+            "searches won't find scenes stored by other processes"
+        )
+    
     # Configure LangSmith tracing
     if _configure_langsmith(settings):
         logger.info(f"LangSmith tracing enabled for project: {settings.langchain_project}")
     else:
         logger.info("LangSmith tracing disabled (no API key configured)")
     
+    # Create the agents after tracing is configured
+    app.state.agents = await init_agents()
+    logger.info(f"Initialized {len(app.state.agents)} agents")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Moo Director API")
+    # Let fire-and-forget scene stores reach the writer queue before flushing it
+    await wait_for_background_tasks()
+    shutdown_scene_memory()
 
 
 # Create FastAPI app
@@ -88,11 +118,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Configure CORS
+# Configure CORS - explicit origins are matched by membership; the API uses
+# no cookies, so credentials stay disabled
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify allowed origins
-    allow_credentials=True,
+    allow_origins=get_settings().cors_origin_list,
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -119,5 +150,9 @@ if __name__ == "__main__":
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        # Each worker is its own process and event loop (ignored with reload)
+        workers=None if settings.debug else settings.workers,
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+        http="httptools" if HTTPTOOLS_AVAILABLE else "h11"
     )